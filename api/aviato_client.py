@@ -0,0 +1,257 @@
+import os
+import logging
+import random
+import time
+import dotenv
+import requests
+from requests.adapters import HTTPAdapter
+from threading import Lock, BoundedSemaphore
+from urllib.parse import urlsplit
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+dotenv.load_dotenv()
+
+aviato_api = os.getenv("AVIATO_API_KEY")
+_AUTH = f"Bearer {aviato_api}"
+logger = logging.getLogger(__name__)
+
+# Upper bound on Aviato requests in flight at once across all worker threads
+MAX_CONCURRENT_REQUESTS = 8
+_in_flight = BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+# One pooled keep-alive session for every call to data.api.aviato.co.
+# 429s are left to the callers, which already back off on rate limiting.
+session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+)
+session.mount("https://", _adapter)
+# Bound once here; call sites never pass their own headers
+session.headers["Authorization"] = _AUTH
+# gzip/deflate, plus br when brotli is installed; urllib3 only advertises what it can decode
+session.headers.update(make_headers(accept_encoding=True))
+
+DEFAULT_TIMEOUT = 20  # seconds
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: bursts of up to `capacity` calls go out
+    immediately, and the long-run rate stays at `rate` calls per second.
+
+    A caller that finds the bucket empty reserves its token (the balance goes
+    negative) and sleeps outside the lock until the token has refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.ts = time.monotonic()
+        self._lock = Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+# Refill-and-consume in one atomic step so every process shares a single bucket.
+# Returns how long the caller must wait for its (already reserved) token.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tok', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate) - 1
+redis.call('HSET', KEYS[1], 'tok', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 60)
+if tokens < 0 then
+    return tostring(-tokens / rate)
+end
+return '0'
+"""
+
+
+class RedisTokenBucket:
+    """TokenBucket whose state lives in Redis, so the rate limit holds across
+    every worker process rather than per process.
+
+    Falls back to a local TokenBucket if Redis can't be reached.
+    """
+
+    def __init__(self, client, key: str, rate: float, capacity: float):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+        self._fallback = TokenBucket(rate, capacity)
+
+    def take(self):
+        try:
+            delay = float(self._script(keys=[self.key], args=[self.rate, self.capacity]))
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable, limiting in-process: %s", e)
+            self._fallback.take()
+            return
+        if delay > 0:
+            time.sleep(delay)
+
+
+_redis = None
+
+
+def rate_limiter(name: str, rate: float, capacity: float):
+    """Build the rate limiter for one Aviato endpoint group.
+
+    Uses a Redis-backed bucket shared by all processes when REDIS_URL is set,
+    otherwise an in-process TokenBucket.
+    """
+    global _redis
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed; limiting in-process")
+        else:
+            if _redis is None:
+                _redis = redis.Redis.from_url(redis_url)
+            return RedisTokenBucket(_redis, f"aviato:ratelimit:{name}", rate, capacity)
+    return TokenBucket(rate, capacity)
+
+
+class CircuitBreaker:
+    """Fail fast on an endpoint that keeps erroring.
+
+    After `threshold` consecutive 5xx responses or connection failures the
+    breaker opens and calls are refused for `cooldown` seconds. After that it
+    is half-open: a single probe call goes through while the rest are still
+    refused. A success closes the breaker again; a failure re-opens it for
+    another cooldown. A probe that never reports back (its request raised
+    something else) is replaced by a new one after a further cooldown.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.fails = 0
+        self.opened_at = None
+        # When the half-open probe was let through, or None if no probe is out
+        self.probe_at = None
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.cooldown:
+                return False
+            if self.probe_at is not None and now - self.probe_at < self.cooldown:
+                return False
+            self.probe_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.fails = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.fails += 1
+            if self.probe_at is not None:
+                # The probe failed; stay open for another cooldown
+                self.opened_at = time.monotonic()
+                self.probe_at = None
+            elif self.fails >= self.threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                logger.warning("Aviato endpoint failing, pausing calls for %ss", self.cooldown)
+
+
+_breakers = {}
+_breakers_lock = Lock()
+
+
+def _endpoint_template(url):
+    # ".../company/<id>/founders" -> "company/{id}/founders"; "company/search" stays as is
+    parts = urlsplit(url).path.strip("/").split("/")
+    if len(parts) > 2:
+        parts[1:-1] = ["{id}"] * (len(parts) - 2)
+    return "/".join(parts)
+
+
+def _breaker_for(url):
+    # One breaker per endpoint, not per company, and not shared between endpoints
+    # that merely end in the same segment (company/search vs person/search)
+    endpoint = _endpoint_template(url)
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker()
+        return breaker
+
+
+def _send(method, url, limiter, timeout, **kwargs):
+    breaker = _breaker_for(url)
+    if not breaker.allow():
+        logger.debug("Circuit open, skipping %s", url)
+        return None
+    if limiter is not None:
+        limiter.take()
+    try:
+        with _in_flight:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+    except (requests.ConnectionError, requests.Timeout):
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def get(url, limiter=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GET an Aviato URL, honoring `limiter` and the shared in-flight cap.
+
+    Returns None without calling out while the endpoint's circuit breaker is open.
+    """
+    return _send("GET", url, limiter, timeout, **kwargs)
+
+
+def post(url, limiter=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """POST to an Aviato URL; same limiter, in-flight cap and circuit breaker as get()."""
+    return _send("POST", url, limiter, timeout, **kwargs)
+
+
+def retry_after(response, default: float) -> float:
+    """Seconds to wait before retrying a rate-limited response.
+
+    Uses the server's Retry-After header when it is given in seconds, falling
+    back to `default`, with +/-20% jitter so parallel workers don't retry in lockstep.
+    """
+    try:
+        delay = float(response.headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        # Retry-After can also be an HTTP date; just use our own backoff then
+        delay = default
+    return max(delay, 0) * (0.8 + 0.4 * random.random())
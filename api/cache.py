@@ -0,0 +1,188 @@
+import os
+import time
+import logging
+import sqlite3
+import functools
+import inspect
+import orjson
+from collections import OrderedDict
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """SQLite-backed key/value store with per-entry expiry, so cached API
+    results survive process restarts. Values must be JSON-serializable.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str, default=None):
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Disk cache read failed for %s: %s", key, e)
+            return default
+        if row is None or row[1] <= time.time():
+            return default
+        return orjson.loads(row[0])
+
+    def set(self, key: str, value, ttl: float):
+        blob = orjson.dumps(value)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, blob, time.time() + ttl),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Disk cache write failed for %s: %s", key, e)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+
+_disk_cache = None
+_disk_cache_lock = Lock()
+
+
+def get_disk_cache():
+    """Shared DiskCache at $AVIATO_CACHE_PATH, or None when that isn't set."""
+    global _disk_cache
+    path = os.getenv("AVIATO_CACHE_PATH")
+    if not path:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            try:
+                _disk_cache = DiskCache(path)
+            except sqlite3.Error as e:
+                logger.warning("Disk cache at %s unavailable: %s", path, e)
+                return None
+    return _disk_cache
+
+
+# Every TTLCache created by ttl_cached (or passed to register), so they can be flushed together
+_registry = []
+
+
+def register(cache):
+    """Include a standalone cache in clear_caches(); returns it for chaining."""
+    _registry.append(cache)
+    return cache
+
+
+def clear_caches(disk: bool = False):
+    """Drop every ttl_cached entry in this process, and the disk cache too if `disk`."""
+    for cache in _registry:
+        cache.clear()
+    if disk:
+        disk_cache = get_disk_cache()
+        if disk_cache is not None:
+            disk_cache.clear()
+
+
+def ttl_cached(ttl: float = 86400, maxsize: int = 4096, key=None, persist_as: str = None, version: str = "v1"):
+    """Memoize a fetcher in a TTLCache.
+
+    `key` builds the cache key from the call arguments (defaults to the
+    argument values bound to the signature, so f(x) and f(company_id=x) share
+    an entry); a non-tuple key is wrapped in a 1-tuple, and returning None
+    skips the cache for that call. Falsy results are not cached, since
+    fetchers return None/[] on API errors and those shouldn't stick around
+    for the whole TTL.
+
+    Cached values are handed out shared, not copied: callers must treat them
+    as read-only and copy anything they want to modify.
+
+    With `persist_as`, misses also fall through to the disk cache (when
+    enabled) under "<persist_as>:<key>:<version>"; bump `version` whenever
+    the shape of the cached value changes.
+    """
+    def decorator(func):
+        cache = register(TTLCache(maxsize=maxsize, ttl=ttl))
+        signature = inspect.signature(func)
+
+        def default_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments.values())
+
+        make_key = key or default_key
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_key(*args, **kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
+            if not isinstance(cache_key, tuple):
+                cache_key = (cache_key,)
+            value = cache.get(cache_key)
+            if value is not None:
+                return value
+
+            disk = get_disk_cache() if persist_as else None
+            if disk is not None:
+                disk_key = f"{persist_as}:{':'.join(map(str, cache_key))}:{version}"
+                value = disk.get(disk_key)
+                if value is not None:
+                    cache.set(cache_key, value)
+                    return value
+
+            value = func(*args, **kwargs)
+            if value:
+                cache.set(cache_key, value)
+                if disk is not None:
+                    disk.set(disk_key, value, ttl)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
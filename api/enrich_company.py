@@ -1,88 +1,125 @@
-import requests
-import os
+import re
 import logging
-import json 
+import orjson
 import dotenv
 import time
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+from api import aviato_client
+from api.cache import ttl_cached
 
 dotenv.load_dotenv()
 
-aviato_api = os.getenv("AVIATO_API_KEY")
 logger = logging.getLogger(__name__)
 
-# Global rate limiter to track API calls across all functions
-_last_api_call_time = 0
-_api_call_lock = Lock()
-_min_delay_between_calls = 2.0  # 2 seconds between ANY API calls (increased from 1s)
+# Global rate limiter shared by every enrichment call:
+# 0.5 calls/s long-run (one every 2s) with bursts of up to 4
+_rate_limiter = aviato_client.rate_limiter("enrich", rate=0.5, capacity=4)
 
+# Shared pool for the independent per-company lookups in complete_company_enrichment
+_enrichment_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="aviato-enrich")
+
+# Company data changes slowly, so repeat lookups are served from memory (and from
+# the disk cache when AVIATO_CACHE_PATH is set) for a day. Bump the `version` passed
+# to ttl_cached when parse_enrich_response or _slim_employee change shape.
+CACHE_TTL = 24 * 60 * 60  # seconds
+
+# List endpoints are paged; cap how many pages one company can pull in
+PER_PAGE = 100
+MAX_PAGES = 10
+# Separate from _enrichment_pool: its tasks block on these page fetches
+_page_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aviato-pages")
+# Whole companies in complete_company_enrichment_many; again its own pool, since
+# those tasks wait on _enrichment_pool. The rate limiter sets the real pace.
+_batch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="aviato-batch")
 
-def _wait_for_rate_limit():
-    """Global rate limiter - ensures minimum delay between ANY API calls"""
-    global _last_api_call_time
-    
-    with _api_call_lock:
-        current_time = time.time()
-        time_since_last_call = current_time - _last_api_call_time
-        
-        if time_since_last_call < _min_delay_between_calls:
-            sleep_time = _min_delay_between_calls - time_since_last_call
-            time.sleep(sleep_time)
-        
-        _last_api_call_time = time.time()
 
+# Slug after /company/, stopping at any further path, querystring or fragment
+_LINKEDIN_RE = re.compile(r"/company/([^/?#]+)")
 
 def get_linkedin_id(company_linkedin_url):
-    # Split the url by /company/ and take the last part
-    linkedin_id = company_linkedin_url.split("/company/")[-1]
-    # Remove any trailing / from the linkedin_id
-    linkedin_id = linkedin_id.rstrip("/")
-    return linkedin_id
+    match = _LINKEDIN_RE.search(company_linkedin_url)
+    if match:
+        return match.group(1)
+    # Not a /company/ URL; fall back to its last path segment
+    return company_linkedin_url.rstrip("/").rsplit("/", 1)[-1]
+
+def _enrich_cache_key(company_website=None, company_linkedin_url=None):
+    if company_website:
+        return ("website", company_website)
+    if company_linkedin_url:
+        return ("linkedinID", get_linkedin_id(company_linkedin_url))
+    return None
 
+@ttl_cached(ttl=CACHE_TTL, key=_enrich_cache_key, persist_as="enrich")
 def enrich_company(company_website=None, company_linkedin_url=None):
     """
-    Enrich company data using website URL via Aviato API.
-    Returns the raw company data from the API.
+    Enrich company data by website URL, or by LinkedIn company URL when no
+    website is given, via Aviato API. Returns the parsed company data, or None
+    if neither identifier is given or the lookup fails.
     """
-    # Use global rate limiter
-    _wait_for_rate_limit()
+    if not company_website and not company_linkedin_url:
+        logger.error("enrich_company called with no website or LinkedIn URL")
+        return None
 
     if company_website:
-        response = requests.get(
-            "https://data.api.aviato.co/company/enrich?website=" + company_website,
-            headers={
-                "Authorization": "Bearer " + aviato_api
-            },
-    )
-    elif company_linkedin_url:
-        linkedin_id = get_linkedin_id(company_linkedin_url)
-        response = requests.get(
-            "https://data.api.aviato.co/company/enrich?linkedinID=" + linkedin_id,
-            headers={
-                "Authorization": "Bearer " + aviato_api
-            },
+        params = {'website': company_website}
+    else:
+        params = {'linkedinID': get_linkedin_id(company_linkedin_url)}
+
+    response = aviato_client.get(
+        f"https://data.api.aviato.co/company/enrich?{urlencode(params)}",
+        limiter=_rate_limiter,
     )
+    if response is None:
+        return None
     
     # Check if response is successful
     if response.status_code != 200:
-        logger.error("Company API error for website %s: Status %s | Snippet: %s", 
-                    company_website, response.status_code, response.text[:200])
+        # Only decode the body for the snippet if the record will actually be emitted
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Company API error for %s: Status %s | Snippet: %s",
+                         params, response.status_code, response.text[:200])
         return None
     
     # Check if response has content
-    if not response.text.strip():
+    if not response.content:
         logger.warning("Empty company response")
         return None
     
     # Try to parse JSON
     try:
-        company = response.json()
+        company = orjson.loads(response.content)
         return parse_enrich_response(company)
-    except (ValueError, requests.exceptions.JSONDecodeError) as e:
-        logger.error("Company JSON decode error: %s | Snippet: %s", 
-                    e, response.text[:200])
+    except orjson.JSONDecodeError as e:
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("Company JSON decode error: %s | Snippet: %s",
+                         e, response.text[:200])
         return None
 
+# Fields copied straight from the enrich response as (key, default factory);
+# None means a missing key maps to None, list means it maps to a fresh []
+_ENRICH_SCHEMA = (
+    # Basic company info
+    ('id', None), ('name', None), ('legalName', None), ('URLs', list), ('linkedinID', None),
+    ('industryList', list), ('description', None), ('founded', None), ('status', None),
+    # Funding info
+    ('totalFunding', None), ('fundingRoundCount', None),
+    # Products and business model
+    ('productList', list), ('businessModelList', list), ('embeddedNews', list),
+    # Company status
+    ('isAcquired', None), ('isExited', None), ('isShutDown', None),
+    # Jobs and customers
+    ('jobListingList', list), ('customerTypes', list),
+    # Patents and awards
+    ('ownedPatents', list), ('governmentAwards', list),
+    # Web traffic data
+    ('monthlyWebTrafficChange', None), ('monthlyWebTrafficPercent', None),
+    ('yearlyWebTrafficChange', None), ('yearlyWebTrafficPercent', None),
+    ('currentWebTraffic', None), ('webTrafficSources', list), ('webViewerCountries', list),
+)
+_LOCATION_FIELDS = ('country', 'region', 'locality')
+
 def parse_enrich_response(response):
     """
     Parse the enrich company response and return a dictionary with the following keys:
@@ -94,205 +131,136 @@ def parse_enrich_response(response):
     """
     if not response:
         return None
-    
-    # Extract location details
-    location_details = response.get('locationDetails', {})
-    
-    parsed_data = {
-        # Basic company info
-        'id': response.get('id'),
-        'name': response.get('name'),
-        'legalName': response.get('legalName'),
-        'country': location_details.get('country', {}).get('name'),
-        'region': location_details.get('region', {}).get('name'),
-        'locality': location_details.get('locality', {}).get('name'),
-        'URLs': response.get('URLs', []),
-        'linkedinID': response.get('linkedinID'),
-        'industryList': response.get('industryList', []),
-        'description': response.get('description'),
-        'founded': response.get('founded'),
-        'status': response.get('status'),
-        
-        # Funding info
-        'totalFunding': response.get('totalFunding'),
-        'fundingRoundCount': response.get('fundingRoundCount'),
-        
-        # Products and business model
-        'productList': response.get('productList', []),
-        'businessModelList': response.get('businessModelList', []),
-        'embeddedNews': response.get('embeddedNews', []),
-        
-        # Company status
-        'isAcquired': response.get('isAcquired'),
-        'isExited': response.get('isExited'),
-        'isShutDown': response.get('isShutDown'),
-        
-        # Jobs and customers
-        'jobListingList': response.get('jobListingList', []),
-        'customerTypes': response.get('customerTypes', []),
-        
-        # Patents and awards
-        'ownedPatents': response.get('ownedPatents', []),
-        'governmentAwards': response.get('governmentAwards', []),
-        
-        # Web traffic data
-        'monthlyWebTrafficChange': response.get('monthlyWebTrafficChange'),
-        'monthlyWebTrafficPercent': response.get('monthlyWebTrafficPercent'),
-        'yearlyWebTrafficChange': response.get('yearlyWebTrafficChange'),
-        'yearlyWebTrafficPercent': response.get('yearlyWebTrafficPercent'),
-        'currentWebTraffic': response.get('currentWebTraffic'),
-        'webTrafficSources': response.get('webTrafficSources', []),
-        'webViewerCountries': response.get('webViewerCountries', [])
-    }
-    
-    return parsed_data
 
-def get_acq(company_id):
-    try:
-        # Use global rate limiter
-        _wait_for_rate_limit()
-        
-        response = requests.get(
-                "https://data.api.aviato.co/company/" + company_id + "/acquisitions?perPage=100&page=1",
-                headers={
-                    "Authorization": "Bearer " + aviato_api
-                },
-        )
-        
-        if response.status_code != 200:
-            logger.warning(f"get_acq returned status {response.status_code} for company {company_id}")
-            return []
-        
-        if not response.text.strip():
-            logger.warning(f"get_acq returned empty response for company {company_id}")
-            return []
-        
-        result = response.json()
-        return result.get("acquisitions", [])
-    except (ValueError, requests.exceptions.JSONDecodeError) as e:
-        logger.error(f"get_acq JSON decode error for company {company_id}: {e} | Snippet: {response.text[:200] if 'response' in locals() else 'N/A'}")
-        return []
-    except Exception as e:
-        logger.error(f"get_acq error for company {company_id}: {e}")
-        return []
-        
+    parsed_data = {}
+    for key, default in _ENRICH_SCHEMA:
+        parsed_data[key] = response.get(key) if default is None else response.get(key, default())
 
-def get_founders(company_id):
-    max_retries = 3
-    
+    # Location names are nested one level down under locationDetails
+    location_details = response.get('locationDetails') or {}
+    for key in _LOCATION_FIELDS:
+        parsed_data[key] = (location_details.get(key) or {}).get('name')
+
+    return parsed_data
+
+def _fetch_page(company_id, endpoint, page, max_retries=3):
+    """
+    Fetch one page of a per-company Aviato endpoint (founders, employees, ...),
+    retrying on rate limits and errors. Returns the parsed body, or None on failure.
+    """
+    retry_delay = 0
     for attempt in range(max_retries):
         try:
             if attempt > 0:
-                # Exponential backoff: 5s, 10s, 20s
-                retry_delay = 5 * (2 ** (attempt - 1))
-                logger.info(f"Retrying get_founders for {company_id} after {retry_delay}s delay (attempt {attempt + 1}/{max_retries})")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Retrying %s page %s for %s after %.1fs delay (attempt %s/%s)",
+                                endpoint, page, company_id, retry_delay, attempt + 1, max_retries)
                 time.sleep(retry_delay)
             
-            # Use global rate limiter
-            _wait_for_rate_limit()
-            
-            response = requests.get(
-                    "https://data.api.aviato.co/company/" + company_id + "/founders?perPage=100&page=1",
-                    headers={
-                        "Authorization": "Bearer " + aviato_api
-                    },
+            response = aviato_client.get(
+                    f"https://data.api.aviato.co/company/{quote(company_id)}/{endpoint}?perPage={PER_PAGE}&page={page}",
+                    limiter=_rate_limiter,
             )
+            if response is None:
+                # Circuit open; don't sit through retries against a failing endpoint
+                return None
             
             if response.status_code == 429:
-                # Rate limited - retry with backoff
+                # Rate limited - wait as long as the server asks, else back off 5s, 10s
                 if attempt < max_retries - 1:
+                    retry_delay = aviato_client.retry_after(response, default=5 * (2 ** attempt))
                     continue
                 else:
-                    logger.warning(f"get_founders rate limited for company {company_id} after {max_retries} attempts")
-                    return []
+                    logger.warning("%s rate limited for company %s after %s attempts", endpoint, company_id, max_retries)
+                    return None
             
             if response.status_code != 200:
-                logger.warning(f"get_founders returned status {response.status_code} for company {company_id}")
-                return []
+                logger.warning("%s returned status %s for company %s", endpoint, response.status_code, company_id)
+                return None
+            
+            if not response.content:
+                logger.warning("%s returned empty response for company %s", endpoint, company_id)
+                return None
             
-            result = response.json()
-            return result.get("founders", [])
+            return orjson.loads(response.content)
             
         except Exception as e:
-            logger.warning(f"get_founders error for company {company_id}: {e}")
+            logger.warning("%s error for company %s: %s", endpoint, company_id, e)
             if attempt < max_retries - 1:
+                # Exponential backoff: 5s, 10s
+                retry_delay = 5 * (2 ** attempt)
                 continue
-            return []
+            return None
     
-    return []
+    return None
+
+def _fetch_list(company_id, endpoint, key, max_pages=MAX_PAGES):
+    """
+    Fetch the `key` list from a per-company Aviato endpoint, following
+    pagination up to `max_pages`. Returns None if the first page fails, so
+    callers can tell a failed lookup from an empty one; a failed later page
+    just truncates the result.
+    """
+    first = _fetch_page(company_id, endpoint, 1)
+    if first is None:
+        return None
+    items = list(first.get(key) or [])
+
+    pages = first.get("pages")
+    if isinstance(pages, int):
+        # Page count is known up front, so fetch the rest concurrently
+        remaining = range(2, min(pages, max_pages) + 1)
+        for result in _page_pool.map(lambda page: _fetch_page(company_id, endpoint, page), remaining):
+            if result is not None:
+                items.extend(result.get(key) or [])
+        return items
+
+    # No page count in the response; keep going while pages come back full
+    page, last = 1, items
+    while len(last) >= PER_PAGE and page < max_pages:
+        page += 1
+        result = _fetch_page(company_id, endpoint, page)
+        if result is None:
+            break
+        last = result.get(key) or []
+        items.extend(last)
+    return items
+
+@ttl_cached(ttl=CACHE_TTL, persist_as="acquisitions")
+def get_acq(company_id):
+    return _fetch_list(company_id, "acquisitions", "acquisitions")
 
+@ttl_cached(ttl=CACHE_TTL, persist_as="founders")
+def get_founders(company_id):
+    return _fetch_list(company_id, "founders", "founders")
+
+# Employee records are large; keep only the fields prospecting and role matching read
+_EMPLOYEE_FIELDS = ('id', 'person', 'positionList')
+_EMPLOYEE_PERSON_FIELDS = ('id', 'fullName', 'location', 'URLs')
+_POSITION_FIELDS = ('title', 'startDate', 'endDate')
+
+def _slim_employee(employee):
+    slim = {k: employee[k] for k in _EMPLOYEE_FIELDS if k in employee}
+    person = slim.get('person')
+    if isinstance(person, dict):
+        slim['person'] = {k: person[k] for k in _EMPLOYEE_PERSON_FIELDS if k in person}
+    positions = slim.get('positionList')
+    if isinstance(positions, list):
+        slim['positionList'] = [
+            {k: pos[k] for k in _POSITION_FIELDS if k in pos} for pos in positions if isinstance(pos, dict)
+        ]
+    return slim
+
+@ttl_cached(ttl=CACHE_TTL, persist_as="employees")
 def get_employees(company_id):
-    max_retries = 3
-    
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                # Exponential backoff: 5s, 10s, 20s
-                retry_delay = 5 * (2 ** (attempt - 1))
-                logger.info(f"Retrying get_employees for {company_id} after {retry_delay}s delay (attempt {attempt + 1}/{max_retries})")
-                time.sleep(retry_delay)
-            
-            # Use global rate limiter
-            _wait_for_rate_limit()
-            
-            response = requests.get(
-                    "https://data.api.aviato.co/company/" + company_id + "/employees?perPage=100&page=1",
-                    headers={
-                        "Authorization": "Bearer " + aviato_api
-                    },
-            )
-            
-            if response.status_code == 429:
-                # Rate limited - retry with backoff
-                if attempt < max_retries - 1:
-                    continue
-                else:
-                    logger.warning(f"get_employees rate limited for company {company_id} after {max_retries} attempts")
-                    return []
-            
-            if response.status_code != 200:
-                logger.warning(f"get_employees returned status {response.status_code} for company {company_id}")
-                return []
-            
-            result = response.json()
-            return result.get("employees", [])
-            
-        except Exception as e:
-            logger.warning(f"get_employees error for company {company_id}: {e}")
-            if attempt < max_retries - 1:
-                continue
-            return []
-    
-    return []
+    employees = _fetch_list(company_id, "employees", "employees")
+    if employees is None:
+        return None
+    return [_slim_employee(e) for e in employees]
 
+@ttl_cached(ttl=CACHE_TTL, persist_as="investments")
 def get_investors(company_id):
-    try:
-        # Use global rate limiter
-        _wait_for_rate_limit()
-        
-        response = requests.get(
-                "https://data.api.aviato.co/company/" + company_id + "/investments?perPage=100&page=1",
-                headers={
-                    "Authorization": "Bearer " + aviato_api
-                },
-        )
-        
-        if response.status_code != 200:
-            logger.warning(f"get_investors returned status {response.status_code} for company {company_id}")
-            return []
-        
-        if not response.text.strip():
-            logger.warning(f"get_investors returned empty response for company {company_id}")
-            return []
-        
-        result = response.json()
-        return result.get("investments", [])
-    except (ValueError, requests.exceptions.JSONDecodeError) as e:
-        logger.error(f"get_investors JSON decode error for company {company_id}: {e} | Snippet: {response.text[:200] if 'response' in locals() else 'N/A'}")
-        return []
-    except Exception as e:
-        logger.error(f"get_investors error for company {company_id}: {e}")
-        return []
+    return _fetch_list(company_id, "investments", "investments")
 
 
 def complete_company_enrichment(company_website=None, company_linkedin_url=None):
@@ -301,13 +269,35 @@ def complete_company_enrichment(company_website=None, company_linkedin_url=None)
     if not company:
         return None
 
-    company["acquisitions"] = get_acq(company["id"])
-    company["founders"] = get_founders(company["id"])
-    company["investors"] = get_investors(company["id"])
+    # Copy so the cached enrichment result isn't mutated
+    company = dict(company)
 
-    return company
+    # Acquisitions, founders and investors don't depend on each other, so overlap their waits
+    company_id = company["id"]
+    acquisitions = _enrichment_pool.submit(get_acq, company_id)
+    founders = _enrichment_pool.submit(get_founders, company_id)
+    investors = _enrichment_pool.submit(get_investors, company_id)
 
+    # A failed lookup (None) shows up as an empty list, as before
+    company["acquisitions"] = acquisitions.result() or []
+    company["founders"] = founders.result() or []
+    company["investors"] = investors.result() or []
 
+    return company
 
-    
 
+def complete_company_enrichment_many(company_websites=(), company_linkedin_urls=()):
+    """
+    Run complete_company_enrichment for a batch of websites and/or LinkedIn
+    URLs concurrently. Returns results in input order (websites first), with
+    None for companies that couldn't be enriched.
+    """
+    futures = [
+        _batch_pool.submit(complete_company_enrichment, company_website=website)
+        for website in company_websites
+    ]
+    futures += [
+        _batch_pool.submit(complete_company_enrichment, company_linkedin_url=url)
+        for url in company_linkedin_urls
+    ]
+    return [future.result() for future in futures]
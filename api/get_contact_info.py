@@ -1,47 +1,51 @@
-import requests
-import os
 import logging
-import json
+import orjson
 import dotenv
-import time
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from api import aviato_client
+from api.cache import ttl_cached
 
 dotenv.load_dotenv()
 
-aviato_api = os.getenv("AVIATO_API_KEY")
 logger = logging.getLogger(__name__)
 
-_last_call = 0.0
-_lock = Lock()
-_min_delay = 1.5  # seconds
+_rate_limiter = aviato_client.rate_limiter("contact-info", rate=1 / 1.5, capacity=4)  # one call per 1.5s long-run
 
-def _rate_limit():
-    global _last_call
-    with _lock:
-        now = time.time()
-        elapsed = now - _last_call
-        if elapsed < _min_delay:
-            time.sleep(_min_delay - elapsed)
-        _last_call = time.time()
+# Aviato has no bulk contact-info route, so bulk lookups fan out over this pool
+_contact_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="aviato-contact")
 
+@ttl_cached(ttl=24 * 60 * 60, persist_as="contact-info")
 def get_contact_info(person_id: str):
     """Fetch contact info for a person by ID. Returns dict or None on error."""
     if not person_id:
         return None
 
-    _rate_limit()
     try:
-        response = requests.get(
-            f"https://data.api.aviato.co/person/{person_id}/contact-info",
-            headers={"Authorization": f"Bearer {aviato_api}"},
-            timeout=20,
+        response = aviato_client.get(
+            f"https://data.api.aviato.co/person/{quote(person_id)}/contact-info",
+            limiter=_rate_limiter,
         )
+        if response is None:
+            return None
         if response.status_code != 200:
             logger.warning("get_contact_info status %s for person %s", response.status_code, person_id)
             return None
-        if not response.text.strip():
+        if not response.content:
             return None
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as e:
         logger.warning("get_contact_info error for %s: %s", person_id, e)
-        return None
\ No newline at end of file
+        return None
+
+def get_contact_info_bulk(person_ids):
+    """Fetch contact info for many people concurrently.
+
+    Returns a dict of person_id -> contact info (or None on error); each
+    distinct ID is looked up once.
+    """
+    futures = {}
+    for person_id in person_ids:
+        if person_id and person_id not in futures:
+            futures[person_id] = _contact_pool.submit(get_contact_info, person_id)
+    return {person_id: future.result() for person_id, future in futures.items()}
@@ -1,13 +1,28 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, NamedTuple, Optional
 import re
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
-from api.search import search_aviato_companies
+from api.search import search_aviato_companies, MAX_SEARCH_LIMIT
 from api.enrich_company import get_founders, get_employees
-from api.get_contact_info import get_contact_info
+from api.get_contact_info import get_contact_info_bulk
+from api.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Shared read-only default for `.get(...) or _EMPTY_DICT` lookups; never mutate it
+_EMPTY_DICT: Dict[str, Any] = {}
+
+# Founder/employee lookups are network-bound; run them concurrently.
+# The enrichment rate limiter still decides how fast requests actually go out.
+_prospecting_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="prospecting")
+
+# Company IDs whose founders and employees both came back empty (not failed).
+# Searches keep returning the same low-signal companies, so skip them for a while;
+# kept much shorter than the enrichment cache since companies do add people.
+_EMPTY_ENRICH = TTLCache(maxsize=10_000, ttl=30 * 60)
+
 SUPPORTED_KEYS = {
     "namequery": "nameQuery",
     "country": "country",
@@ -24,6 +39,12 @@ SUPPORTED_KEYS = {
     "founded": "founded",
 }
 
+# Slack autolinks numbers: <tel:10000000|10000000>, or <123|123> when pasted
+_TEL_RE = re.compile(r"^<tel:(\d+)\|[^>]+>$")
+_ANGLE_RE = re.compile(r"^<([0-9,.$kmbKMB]+)\|[^>]+>$")
+# Shorthand suffixes: 10k, 10m, 1.2b
+_MULT = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
 
 def _coerce_value(key: str, value: str):
     key_lower = key.lower()
@@ -41,31 +62,21 @@ def _coerce_value(key: str, value: str):
             raise ValueError("empty")
         s = s.strip()
         # Extract from Slack tel format
-        m = re.match(r"^<tel:(\d+)\|[^>]+>$", s)
+        m = _TEL_RE.match(s)
         if m:
             s = m.group(1)
         # Remove surrounding angle link if someone pasted <123|123>
-        m2 = re.match(r"^<([0-9,.$kmbKMB]+)\|[^>]+>$", s)
+        m2 = _ANGLE_RE.match(s)
         if m2:
             s = m2.group(1)
 
         # Normalize currency formatting
         s_norm = s.replace(",", "").replace(" ", "").lstrip("$")
         lower = s_norm.lower()
-        multiplier = 1
-        if lower.endswith("k"):
-            multiplier = 1_000
-            s_norm = lower[:-1]
-        elif lower.endswith("m"):
-            multiplier = 1_000_000
-            s_norm = lower[:-1]
-        elif lower.endswith("b"):
-            multiplier = 1_000_000_000
-            s_norm = lower[:-1]
+        multiplier = _MULT.get(lower[-1:])
         # Allow decimals for k/m/b then cast to int
-        if multiplier != 1:
-            val = float(s_norm)
-            return int(val * multiplier)
+        if multiplier:
+            return int(float(lower[:-1]) * multiplier)
         # Plain integer string
         return int(s_norm)
 
@@ -84,6 +95,30 @@ def _coerce_value(key: str, value: str):
     return v
 
 
+# How build_filters_from_text stores each mapped key; anything else is set as-is
+def _set_filter(filters: Dict[str, Any], mapped: str, value):
+    filters[mapped] = value
+
+
+def _add_industries(filters: Dict[str, Any], mapped: str, value):
+    # Multiple entries accumulate (AND across industries) in an ordered dict until parsing ends
+    filters.setdefault("industryList", {}).update(dict.fromkeys(value if isinstance(value, list) else [value]))
+
+
+def _set_funding(filters: Dict[str, Any], mapped: str, value):
+    # totalFunding_gte/_lte carry the operation; bare totalFunding defaults to lte
+    operation = "gte" if mapped.endswith("_gte") else "lte"
+    filters["totalFunding"] = {"value": value, "operation": operation}
+
+
+_FILTER_HANDLERS = {
+    "industryList": _add_industries,
+    "totalFunding": _set_funding,
+    "totalFunding_gte": _set_funding,
+    "totalFunding_lte": _set_funding,
+}
+
+
 def build_filters_from_text(query_text: str) -> Dict[str, Any]:
     """
     Parse a lightweight "key:value" query string into a filter dict
@@ -135,35 +170,58 @@ def build_filters_from_text(query_text: str) -> Dict[str, Any]:
 
         coerced = _coerce_value(key_norm, raw_val)
 
-        # Allow multiple entries to accumulate for industryList as AND across industries
-        if mapped == "industryList":
-            existing = filters.get("industryList")
-            if existing is None:
-                filters["industryList"] = coerced if isinstance(coerced, list) else [coerced]
-            else:
-                if isinstance(coerced, list):
-                    filters["industryList"].extend(coerced)
-                else:
-                    filters["industryList"].append(coerced)
-        # Handle totalFunding with operation suffix
-        elif mapped in ("totalFunding_gte", "totalFunding_lte"):
-            # Store as dict with operation
-            operation = "gte" if mapped.endswith("_gte") else "lte"
-            filters["totalFunding"] = {"value": coerced, "operation": operation}
-        # Default totalFunding to lte
-        elif mapped == "totalFunding":
-            filters["totalFunding"] = {"value": coerced, "operation": "lte"}
-        else:
-            filters[mapped] = coerced
-
-    # Deduplicate industries if present
-    if isinstance(filters.get("industryList"), list):
-        filters["industryList"] = [i for idx, i in enumerate(filters["industryList"]) if i and i not in filters["industryList"][0:idx]]
+        _FILTER_HANDLERS.get(mapped, _set_filter)(filters, mapped, coerced)
+
+    # Industries were deduplicated as they accumulated (dict keys keep first-seen order)
+    if "industryList" in filters:
+        filters["industryList"] = [i for i in filters["industryList"] if i]
 
     return filters
 
 
-def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_limit: int = 100, roles_of_interest: List[str] = None) -> Dict[str, Any]:
+class Contact(NamedTuple):
+    """One matched employee flattened for export (see prospect_companies).
+
+    A tuple rather than a dict to keep large contact lists small; use
+    `_asdict()` where a dict is needed.
+    """
+    personId: Optional[str]
+    name: Optional[str]
+    title: Optional[str]
+    linkedin: Optional[str]
+    email: Optional[str]
+    companyId: Optional[str]
+    company: Optional[str]
+    companyCountry: Optional[str]
+    companyRegion: Optional[str]
+    companyLocality: Optional[str]
+    industryList: List[str]
+    totalFunding: Any
+    contactInfo: Optional[Dict[str, Any]]
+    emails_count: int
+    workEmail: Optional[str]
+    personalEmail: Optional[str]
+
+
+def _current_title(person: Dict[str, Any]) -> str:
+    """Title of the person's current position: the first without an endDate, else the first listed."""
+    positions = person.get("positionList") or []
+    if not positions:
+        return ""
+    current_position = next((pos for pos in positions if not pos.get("endDate")), positions[0])
+    return (current_position or _EMPTY_DICT).get("title") or ""
+
+
+def _employee_row(employee: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an employee record tagged for prospecting, with its current title resolved."""
+    title = _current_title(employee)
+    row = dict(employee, role="employee", _title_l=title.lower())
+    if title:
+        row["currentTitle"] = title
+    return row
+
+
+def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_limit: int = 100, roles_of_interest: List[str] = None, include_raw_contact_info: bool = False) -> Dict[str, Any]:
     """
     Convenience wrapper used by the Slack command. Accepts a lightweight text query,
     builds filters, and calls the Aviato company search. 
@@ -173,61 +231,78 @@ def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_
         enrich_with_people: If True, enriches each company with founders and employees
         enrich_limit: Maximum number of companies to enrich (default: 50)
         roles_of_interest: Optional list of role functions to filter by (e.g., ["Sales", "Marketing"])
+        include_raw_contact_info: If True, keep each contact's full contact-info payload in
+            `contactInfo`; otherwise only the flattened email fields are filled in
     
     Returns:
         Dict with 'items' (list of companies) and 'count'
     """
     filters = build_filters_from_text(query_text)
     logger.info(f"Built filters from command text: {filters}")
-    result = search_aviato_companies(filters)
+    # Only the first enrich_limit companies get enriched, so don't fetch more than that;
+    # without enrichment, return as many as one search page allows (as before paging)
+    result = search_aviato_companies(filters, limit=enrich_limit if enrich_with_people else MAX_SEARCH_LIMIT)
     
     if not result or not result.get("items"):
         return {"items": [], "count": 0}
     
     # Enrich companies with people data
     if enrich_with_people:
-        enriched_items = []
+        # Only companies with at least one person are kept
+        filtered_items = []
         companies = result.get("items", [])
         companies_to_enrich = companies[:enrich_limit]
         
         logger.info(f"Enriching {len(companies_to_enrich)} companies (out of {len(companies)} total) with founders and employees...")
         
+        # Submit every company's lookups up front, then collect them in order
+        pending = []
         for idx, company in enumerate(companies_to_enrich):
             company_id = company.get("id")
             if not company_id:
                 logger.warning(f"Company at index {idx} has no ID, skipping enrichment")
-                enriched_items.append(company)
                 continue
+            if _EMPTY_ENRICH.get(company_id):
+                continue
+            # These functions handle errors internally
+            pending.append((
+                company,
+                _prospecting_pool.submit(get_founders, company_id),
+                _prospecting_pool.submit(get_employees, company_id),
+            ))
+
+        for company, founders_future, employees_future in pending:
+            founders = founders_future.result()
+            employees = employees_future.result()
+            if not founders and not employees:
+                # Only remember companies both endpoints confirmed empty; a failed
+                # lookup (None) may well succeed on the next run
+                if founders is not None and employees is not None:
+                    _EMPTY_ENRICH.set(company["id"], True)
+                logger.debug(f"No people data for {company.get('name', 'Unknown')}")
+                continue
+            founders = founders or []
+            employees = employees or []
             
-            # Get founders and employees (these functions handle errors internally)
-            founders = get_founders(company_id)
-            employees = get_employees(company_id)
-            
-            # Combine into people list
-            people = []
-            if founders:
-                people.extend([{**f, "role": "founder"} for f in founders])
-            if employees:
-                people.extend([{**e, "role": "employee"} for e in employees])
+            # Copy each person, since the fetched lists are shared with the enrichment cache.
+            # Founders and employees are also kept apart so role filtering can skip founders.
+            founder_rows = [dict(f, role="founder") for f in founders]
+            employee_rows = [_employee_row(e) for e in employees]
+            people = founder_rows + employee_rows
             
-            # Add people to company data
-            enriched_company = {
-                **company,
-                "people": people,
-                "founders_count": len(founders),
-                "employees_count": len(employees),
-                "total_people": len(people)
-            }
-            enriched_items.append(enriched_company)
+            # Add people to a shallow copy of the company data
+            enriched_company = company.copy()
+            enriched_company["people"] = people
+            enriched_company["founders"] = founder_rows
+            enriched_company["employees"] = employee_rows
+            enriched_company["founders_count"] = len(founders)
+            enriched_company["employees_count"] = len(employees)
+            enriched_company["total_people"] = len(people)
+            filtered_items.append(enriched_company)
             
-            if people:
-                logger.info(f"Enriched {company.get('name', 'Unknown')}: {len(people)} people ({len(founders)} founders, {len(employees)} employees)")
-            else:
-                logger.debug(f"No people data for {company.get('name', 'Unknown')}")
+            logger.info(f"Enriched {company.get('name', 'Unknown')}: {len(people)} people ({len(founders)} founders, {len(employees)} employees)")
         
-        # Filter to only include companies with at least one person
-        filtered_items = [item for item in enriched_items if item.get("total_people", 0) > 0]
-        logger.info(f"Filtered results: {len(filtered_items)} companies with people data (out of {len(enriched_items)} total)")
+        logger.info(f"Filtered results: {len(filtered_items)} companies with people data (out of {len(companies_to_enrich)} total)")
         
         result["items"] = filtered_items
         result["count"] = len(filtered_items)
@@ -236,23 +311,34 @@ def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_
     if roles_of_interest:
         result = role_filters(result, roles_of_interest)
 
-        # After role filtering, gather contact info and produce flattened contacts list
+        # After role filtering, gather contact info and produce flattened contacts list.
+        # Look everyone up in one batch first, once per distinct person (someone can
+        # appear under several companies); the loop below just reads the results.
+        person_ids = dict.fromkeys(
+            person.get("personId") or (person.get("person") or _EMPTY_DICT).get("id") or person.get("id")
+            for company in result.get("items", [])
+            for person in company.get("people", [])
+            if person.get("role") == "employee"
+        )
+        person_ids.pop(None, None)
+        contact_infos = get_contact_info_bulk(person_ids)
+
         contacts = []
+        # Email coverage counts, accumulated as contacts are built
+        with_any_email = with_work_email = with_personal_email = 0
         for company in result.get("items", []):
             company_id = company.get("id")
             company_name = company.get("name")
             for person in company.get("people", []):
                 if person.get("role") != "employee":
                     continue
-                person_data = person.get("person", {})
+                person_data = person.get("person") or _EMPTY_DICT
                 person_id = person.get("personId") or person_data.get("id") or person.get("id")
                 full_name = person_data.get("fullName") or person.get("fullName")
                 current_title = person.get("currentTitle")
-                linkedin = (person_data.get("URLs", {}) or {}).get("linkedin")
+                linkedin = (person_data.get("URLs") or _EMPTY_DICT).get("linkedin")
 
-                contact_info = None
-                if person_id:
-                    contact_info = get_contact_info(person_id)
+                contact_info = contact_infos.get(person_id) if person_id else None
 
                 # Flatten preferred email from contact_info
                 preferred_email = None
@@ -260,48 +346,50 @@ def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_
                 work_email = None
                 personal_email = None
                 if isinstance(contact_info, dict):
-                    emails_list = contact_info.get("emails") or []
-                    emails_count = len([e for e in emails_list if e.get("email")])
-                    if emails_list:
-                        # Prefer work
-                        work = next((e for e in emails_list if (e.get("type") or "").lower() == "work" and e.get("email")), None)
-                        personal = next((e for e in emails_list if (e.get("type") or "").lower() == "personal" and e.get("email")), None)
-                        any_email = next((e for e in emails_list if e.get("email")), None)
-                        choice = work or personal or any_email
-                        if work:
-                            work_email = work.get("email")
-                        if personal:
-                            personal_email = personal.get("email")
-                        if choice:
-                            preferred_email = choice.get("email")
-
-                contacts.append({
-                    "personId": person_id,
-                    "name": full_name,
-                    "title": current_title,
-                    "linkedin": linkedin,
-                    "email": preferred_email,
-                    "companyId": company_id,
-                    "company": company_name,
-                    "companyCountry": company.get("country"),
-                    "companyRegion": company.get("region"),
-                    "companyLocality": company.get("locality"),
-                    "industryList": company.get("industryList", []),
-                    "totalFunding": company.get("totalFunding"),
-                    "contactInfo": contact_info,
-                    "emails_count": emails_count,
-                    "workEmail": work_email,
-                    "personalEmail": personal_email,
-                })
+                    # One pass: count emails and take the first work, personal and any address
+                    any_email = None
+                    for e in contact_info.get("emails") or []:
+                        address = e.get("email")
+                        if not address:
+                            continue
+                        emails_count += 1
+                        email_type = (e.get("type") or "").lower()
+                        if email_type == "work":
+                            work_email = work_email or address
+                        elif email_type == "personal":
+                            personal_email = personal_email or address
+                        any_email = any_email or address
+                    # Prefer work
+                    preferred_email = work_email or personal_email or any_email
+
+                with_any_email += preferred_email is not None
+                with_work_email += work_email is not None
+                with_personal_email += personal_email is not None
+
+                contacts.append(Contact(
+                    personId=person_id,
+                    name=full_name,
+                    title=current_title,
+                    linkedin=linkedin,
+                    email=preferred_email,
+                    companyId=company_id,
+                    company=company_name,
+                    companyCountry=company.get("country"),
+                    companyRegion=company.get("region"),
+                    companyLocality=company.get("locality"),
+                    industryList=company.get("industryList", []),
+                    totalFunding=company.get("totalFunding"),
+                    contactInfo=contact_info if include_raw_contact_info else None,
+                    emails_count=emails_count,
+                    workEmail=work_email,
+                    personalEmail=personal_email,
+                ))
 
         result["contacts"] = contacts
         result["contacts_count"] = len(contacts)
 
         # Compute contact email metrics
         total = len(contacts)
-        with_any_email = sum(1 for c in contacts if c.get("email"))
-        with_work_email = sum(1 for c in contacts if c.get("workEmail"))
-        with_personal_email = sum(1 for c in contacts if c.get("personalEmail"))
         metrics = {
             "total_contacts": total,
             "with_any_email": with_any_email,
@@ -323,6 +411,154 @@ def prospect_companies(query_text: str, enrich_with_people: bool = True, enrich_
     return result
 
 
+ROLE_FUNCTIONS = {
+    "Accounting": [
+        "Accountant", "Staff Accountant", "Senior Accountant", "Accounting Manager", 
+        "Controller", "Assistant Controller", "Accounting Director", "Chief Accounting Officer",
+        "Bookkeeper", "Accounts Payable", "Accounts Receivable", "Payroll Specialist"
+    ],
+    "Administrative": [
+        "Administrative Assistant", "Executive Assistant", "Office Manager", "Receptionist",
+        "Office Administrator", "Administrative Coordinator", "Chief of Staff", "Secretary",
+        "Office Coordinator", "Administrative Specialist"
+    ],
+    "Arts and Design": [
+        "Graphic Designer", "UI Designer", "UX Designer", "Product Designer", "Creative Director",
+        "Art Director", "Visual Designer", "Brand Designer", "Design Lead", "Senior Designer",
+        "Junior Designer", "Illustrator", "Motion Designer", "3D Designer"
+    ],
+    "Business Development": [
+        "Business Development Manager", "Business Development Representative", "BDR", "BD Manager",
+        "VP Business Development", "Director of Business Development", "Head of Business Development",
+        "Business Development Lead", "Strategic Partnerships Manager", "Partnerships Lead",
+        "Alliance Manager", "Channel Manager", "Partnerships", "Partnership Manager",
+        "Strategic Partnerships", "Alliances", "Channels", "Channel Partnerships",
+        "Go To Market Partnerships", "GTM Partnerships", "Corporate Development", "Corp Dev",
+        "Growth Partnerships", "Ecosystem Partnerships", "Business Partnerships",
+        "Partner Manager", "Partner Development Manager", "Partnerships Director",
+        "Head of Partnerships", "VP Partnerships", "Director Partnerships"
+    ],
+    "Consulting": [
+        "Consultant", "Senior Consultant", "Management Consultant", "Strategy Consultant",
+        "Principal Consultant", "Consulting Manager", "Partner", "Associate Consultant",
+        "Advisory Consultant", "Business Consultant"
+    ],
+    "Engineering": [
+        "Software Engineer", "Senior Software Engineer", "Staff Engineer", "Principal Engineer",
+        "Engineering Manager", "Director of Engineering", "VP Engineering", "CTO",
+        "Chief Technology Officer", "Lead Engineer", "Backend Engineer", "Frontend Engineer",
+        "Full Stack Engineer", "DevOps Engineer", "Site Reliability Engineer", "SRE",
+        "Data Engineer", "Machine Learning Engineer", "ML Engineer", "AI Engineer",
+        "Infrastructure Engineer", "Platform Engineer", "Security Engineer", "QA Engineer",
+        "Test Engineer", "Embedded Engineer", "Mobile Engineer", "iOS Engineer", "Android Engineer"
+    ],
+    "Finance": [
+        "Financial Analyst", "Senior Financial Analyst", "Finance Manager", "Finance Director",
+        "CFO", "Chief Financial Officer", "VP Finance", "Controller", "Treasurer",
+        "FP&A Manager", "Financial Planning Manager", "Investment Analyst", "Finance Lead",
+        "Head of Finance", "Financial Controller"
+    ],
+    "Human Resources": [
+        "HR Manager", "HR Director", "CHRO", "Chief Human Resources Officer", "VP Human Resources",
+        "HR Business Partner", "HRBP", "Recruiter", "Technical Recruiter", "Talent Acquisition",
+        "Talent Acquisition Manager", "Head of Talent", "People Operations", "People Ops Manager",
+        "HR Generalist", "HR Specialist", "Compensation Analyst", "Benefits Manager",
+        "Employee Relations Manager", "HR Coordinator"
+    ],
+    "Information Technology": [
+        "IT Manager", "IT Director", "CIO", "Chief Information Officer", "VP IT",
+        "Systems Administrator", "Network Administrator", "IT Support", "Help Desk",
+        "IT Specialist", "Systems Engineer", "Network Engineer", "IT Analyst",
+        "Infrastructure Manager", "IT Operations Manager"
+    ],
+    "Legal": [
+        "General Counsel", "Chief Legal Officer", "Legal Counsel", "Corporate Counsel",
+        "Senior Counsel", "Staff Attorney", "Legal Director", "VP Legal", "Paralegal",
+        "Legal Manager", "Compliance Manager", "Compliance Officer", "Legal Operations"
+    ],
+    "Marketing": [
+        "Marketing Manager", "Marketing Director", "CMO", "Chief Marketing Officer", "VP Marketing",
+        "Head of Marketing", "Content Marketing Manager", "Digital Marketing Manager",
+        "Product Marketing Manager", "PMM", "Growth Marketing Manager", "Brand Manager",
+        "Marketing Coordinator", "Marketing Specialist",
+        "Marketing Operations",
+        "Content Strategist", "Marketing Analyst", "Communications Manager", "PR Manager",
+        "Growth Lead", "Head of Growth",
+        "Campaign Manager", "Field Marketing",
+    ],
+    "Operations": [
+        "Operations Manager", "Operations Director", "COO", "Chief Operating Officer", "VP Operations",
+        "Head of Operations", "Operations Coordinator", "Operations Analyst", "Operations Lead",
+        "Business Operations Manager", "Revenue Operations", "RevOps", "Sales Operations",
+        "Marketing Operations", "Operations Specialist", "Business Operations", "BizOps",
+        "Strategy & Operations", "Strategy and Operations"
+    ],
+    "Product Management": [
+        "Product Manager", "Senior Product Manager", "Principal Product Manager", "Group Product Manager",
+        "Director of Product", "VP Product", "CPO", "Chief Product Officer", "Head of Product",
+        "Associate Product Manager", "APM", "Product Lead", "Technical Product Manager",
+        "Product Owner", "Product Analyst"
+    ],
+    "Purchasing": [
+        "Purchasing Manager", "Procurement Manager", "Buyer", "Senior Buyer", "Purchasing Agent",
+        "Procurement Specialist", "Supply Chain Manager", "Sourcing Manager", "Vendor Manager",
+        "Procurement Director", "Chief Procurement Officer"
+    ],
+    "Sales": [
+        "Sales Representative", "Account Executive", "AE", "Senior Account Executive",
+        "Sales Manager", "Sales Director", "VP Sales", "CRO", "Chief Revenue Officer",
+        "Head of Sales", "Sales Development Representative", "SDR", "Business Development Representative",
+        "Inside Sales", "Outside Sales", "Enterprise Sales", "Regional Sales Manager",
+        "Territory Manager", "Sales Engineer", "Solutions Engineer", "Sales Operations",
+        "Account Manager", "Customer Success Manager", "CSM", "Growth Sales", "Channel Sales",
+        "Partner Sales", "Alliances Sales", "Account Director", "Key Account Manager"
+    ]
+}
+
+# Keyword/substring sets per function for broader matching
+ROLE_KEYWORDS = {
+    "business development": [
+        "business development", "bd", "partnership", "alliances", "channel", "corporate development",
+        "corp dev", "ecosystem", "partner", "gtm", "go-to-market"
+    ],
+    "marketing": [
+        "marketing", "demand gen", "demand generation", "growth", "brand", 
+        "seo", "content", "campaign", 
+    ],
+    "sales": [
+        "sales", "account executive", "ae", "sdr", "bdr", "account manager", "customer success",
+        "csm", "solutions engineer", "sales engineer", "inside sales", "enterprise sales",
+        "channel sales", "partner sales"
+    ],
+    "operations": [
+        "operations", "revops", "revenue operations", "bizops", "business operations", "strategy & operations",
+        "strategy and operations"
+    ],
+    # Add more functions here as needed
+}
+
+# Lowercase maps for lookup, built once at import
+_ROLE_FUNCTIONS_LOWER = {k.lower(): tuple(t.lower() for t in v) for k, v in ROLE_FUNCTIONS.items()}
+_ROLE_KEYWORDS_LOWER = {k.lower(): tuple(kw.lower() for kw in v) for k, v in ROLE_KEYWORDS.items()}
+
+
+@functools.lru_cache(maxsize=64)
+def _role_matcher(roles: frozenset):
+    """Exact titles, keywords and a compiled keyword regex for a set of lowercased role names.
+
+    A title with a seniority-qualified keyword ("head of sales", "sales director")
+    still contains the bare keyword, so one alternation of the keywords is enough;
+    substring semantics are the same as testing `kw in title` for each keyword.
+    """
+    titles = set()
+    keywords = set()
+    for key in roles:
+        titles.update(_ROLE_FUNCTIONS_LOWER.get(key, ()))
+        keywords.update(_ROLE_KEYWORDS_LOWER.get(key, ()))
+    keyword_re = re.compile("|".join(map(re.escape, sorted(keywords)))) if keywords else None
+    return frozenset(titles), frozenset(keywords), keyword_re
+
+
 def role_filters(prospecting_result: Dict[str, Any], roles_of_interest: List[str]) -> Dict[str, Any]:
     """
     Filter companies to only include those with people matching the roles of interest.
@@ -334,154 +570,14 @@ def role_filters(prospecting_result: Dict[str, Any], roles_of_interest: List[str
     Returns:
         Filtered result dict with only companies that have matching roles
     """
-    ROLE_FUNCTIONS = {
-        "Accounting": [
-            "Accountant", "Staff Accountant", "Senior Accountant", "Accounting Manager", 
-            "Controller", "Assistant Controller", "Accounting Director", "Chief Accounting Officer",
-            "Bookkeeper", "Accounts Payable", "Accounts Receivable", "Payroll Specialist"
-        ],
-        "Administrative": [
-            "Administrative Assistant", "Executive Assistant", "Office Manager", "Receptionist",
-            "Office Administrator", "Administrative Coordinator", "Chief of Staff", "Secretary",
-            "Office Coordinator", "Administrative Specialist"
-        ],
-        "Arts and Design": [
-            "Graphic Designer", "UI Designer", "UX Designer", "Product Designer", "Creative Director",
-            "Art Director", "Visual Designer", "Brand Designer", "Design Lead", "Senior Designer",
-            "Junior Designer", "Illustrator", "Motion Designer", "3D Designer"
-        ],
-        "Business Development": [
-            "Business Development Manager", "Business Development Representative", "BDR", "BD Manager",
-            "VP Business Development", "Director of Business Development", "Head of Business Development",
-            "Business Development Lead", "Strategic Partnerships Manager", "Partnerships Lead",
-            "Alliance Manager", "Channel Manager", "Partnerships", "Partnership Manager",
-            "Strategic Partnerships", "Alliances", "Channels", "Channel Partnerships",
-            "Go To Market Partnerships", "GTM Partnerships", "Corporate Development", "Corp Dev",
-            "Growth Partnerships", "Ecosystem Partnerships", "Business Partnerships",
-            "Partner Manager", "Partner Development Manager", "Partnerships Director",
-            "Head of Partnerships", "VP Partnerships", "Director Partnerships"
-        ],
-        "Consulting": [
-            "Consultant", "Senior Consultant", "Management Consultant", "Strategy Consultant",
-            "Principal Consultant", "Consulting Manager", "Partner", "Associate Consultant",
-            "Advisory Consultant", "Business Consultant"
-        ],
-        "Engineering": [
-            "Software Engineer", "Senior Software Engineer", "Staff Engineer", "Principal Engineer",
-            "Engineering Manager", "Director of Engineering", "VP Engineering", "CTO",
-            "Chief Technology Officer", "Lead Engineer", "Backend Engineer", "Frontend Engineer",
-            "Full Stack Engineer", "DevOps Engineer", "Site Reliability Engineer", "SRE",
-            "Data Engineer", "Machine Learning Engineer", "ML Engineer", "AI Engineer",
-            "Infrastructure Engineer", "Platform Engineer", "Security Engineer", "QA Engineer",
-            "Test Engineer", "Embedded Engineer", "Mobile Engineer", "iOS Engineer", "Android Engineer"
-        ],
-        "Finance": [
-            "Financial Analyst", "Senior Financial Analyst", "Finance Manager", "Finance Director",
-            "CFO", "Chief Financial Officer", "VP Finance", "Controller", "Treasurer",
-            "FP&A Manager", "Financial Planning Manager", "Investment Analyst", "Finance Lead",
-            "Head of Finance", "Financial Controller"
-        ],
-        "Human Resources": [
-            "HR Manager", "HR Director", "CHRO", "Chief Human Resources Officer", "VP Human Resources",
-            "HR Business Partner", "HRBP", "Recruiter", "Technical Recruiter", "Talent Acquisition",
-            "Talent Acquisition Manager", "Head of Talent", "People Operations", "People Ops Manager",
-            "HR Generalist", "HR Specialist", "Compensation Analyst", "Benefits Manager",
-            "Employee Relations Manager", "HR Coordinator"
-        ],
-        "Information Technology": [
-            "IT Manager", "IT Director", "CIO", "Chief Information Officer", "VP IT",
-            "Systems Administrator", "Network Administrator", "IT Support", "Help Desk",
-            "IT Specialist", "Systems Engineer", "Network Engineer", "IT Analyst",
-            "Infrastructure Manager", "IT Operations Manager"
-        ],
-        "Legal": [
-            "General Counsel", "Chief Legal Officer", "Legal Counsel", "Corporate Counsel",
-            "Senior Counsel", "Staff Attorney", "Legal Director", "VP Legal", "Paralegal",
-            "Legal Manager", "Compliance Manager", "Compliance Officer", "Legal Operations"
-        ],
-        "Marketing": [
-            "Marketing Manager", "Marketing Director", "CMO", "Chief Marketing Officer", "VP Marketing",
-            "Head of Marketing", "Content Marketing Manager", "Digital Marketing Manager",
-            "Product Marketing Manager", "PMM", "Growth Marketing Manager", "Brand Manager",
-            "Marketing Coordinator", "Marketing Specialist",
-            "Marketing Operations",
-            "Content Strategist", "Marketing Analyst", "Communications Manager", "PR Manager",
-            "Growth Lead", "Head of Growth",
-            "Campaign Manager", "Field Marketing",
-        ],
-        "Operations": [
-            "Operations Manager", "Operations Director", "COO", "Chief Operating Officer", "VP Operations",
-            "Head of Operations", "Operations Coordinator", "Operations Analyst", "Operations Lead",
-            "Business Operations Manager", "Revenue Operations", "RevOps", "Sales Operations",
-            "Marketing Operations", "Operations Specialist", "Business Operations", "BizOps",
-            "Strategy & Operations", "Strategy and Operations"
-        ],
-        "Product Management": [
-            "Product Manager", "Senior Product Manager", "Principal Product Manager", "Group Product Manager",
-            "Director of Product", "VP Product", "CPO", "Chief Product Officer", "Head of Product",
-            "Associate Product Manager", "APM", "Product Lead", "Technical Product Manager",
-            "Product Owner", "Product Analyst"
-        ],
-        "Purchasing": [
-            "Purchasing Manager", "Procurement Manager", "Buyer", "Senior Buyer", "Purchasing Agent",
-            "Procurement Specialist", "Supply Chain Manager", "Sourcing Manager", "Vendor Manager",
-            "Procurement Director", "Chief Procurement Officer"
-        ],
-        "Sales": [
-            "Sales Representative", "Account Executive", "AE", "Senior Account Executive",
-            "Sales Manager", "Sales Director", "VP Sales", "CRO", "Chief Revenue Officer",
-            "Head of Sales", "Sales Development Representative", "SDR", "Business Development Representative",
-            "Inside Sales", "Outside Sales", "Enterprise Sales", "Regional Sales Manager",
-            "Territory Manager", "Sales Engineer", "Solutions Engineer", "Sales Operations",
-            "Account Manager", "Customer Success Manager", "CSM", "Growth Sales", "Channel Sales",
-            "Partner Sales", "Alliances Sales", "Account Director", "Key Account Manager"
-        ]
-    }
-    
-    # Keyword/substring sets per function for broader matching
-    ROLE_KEYWORDS = {
-        "business development": [
-            "business development", "bd", "partnership", "alliances", "channel", "corporate development",
-            "corp dev", "ecosystem", "partner", "gtm", "go-to-market"
-        ],
-        "marketing": [
-            "marketing", "demand gen", "demand generation", "growth", "brand", 
-            "seo", "content", "campaign", 
-        ],
-        "sales": [
-            "sales", "account executive", "ae", "sdr", "bdr", "account manager", "customer success",
-            "csm", "solutions engineer", "sales engineer", "inside sales", "enterprise sales",
-            "channel sales", "partner sales"
-        ],
-        "operations": [
-            "operations", "revops", "revenue operations", "bizops", "business operations", "strategy & operations",
-            "strategy and operations"
-        ],
-        # Add more functions here as needed
-    }
-
-    # Build lowercase maps for lookup
-    role_functions_lower = {k.lower(): [t.lower() for t in v] for k, v in ROLE_FUNCTIONS.items()}
-    role_keywords_lower = {k.lower(): [kw.lower() for kw in v] for k, v in ROLE_KEYWORDS.items()}
-
-    # Seniority/level patterns to allow flexible matching
-    SENIORITY_HINTS = [
-        "head", "vp", "svp", "evp", "chief", "director", "manager", "lead", "principal",
-        "sr", "senior", "junior", "associate"
-    ]
-
-    # Collect targeted title strings and keyword substrings
-    target_titles = set()
-    target_keywords = set()
     for role in roles_of_interest:
         key = role.lower()
-        if key in role_functions_lower:
-            target_titles.update(role_functions_lower[key])
-        if key in role_keywords_lower:
-            target_keywords.update(role_keywords_lower[key])
-        if key not in role_functions_lower and key not in role_keywords_lower:
+        if key not in _ROLE_FUNCTIONS_LOWER and key not in _ROLE_KEYWORDS_LOWER:
             logger.warning(f"Role function '{role}' not found in ROLE_FUNCTIONS/ROLE_KEYWORDS")
 
+    # Collect targeted title strings and keyword substrings (cached per set of roles)
+    target_titles, target_keywords, keyword_re = _role_matcher(frozenset(role.lower() for role in roles_of_interest))
+
     if not target_titles and not target_keywords:
         logger.warning(f"No matching role functions found for: {roles_of_interest}")
         return prospecting_result
@@ -490,58 +586,37 @@ def role_filters(prospecting_result: Dict[str, Any], roles_of_interest: List[str
         f"Filtering for roles: {roles_of_interest} with {len(target_titles)} exact titles and {len(target_keywords)} keyword patterns"
     )
     
+    # Defined once per call; defaults bind the targets as fast locals
+    def matches_role(t: str, titles=target_titles, search=keyword_re.search if keyword_re else None) -> bool:
+        # Exact title list, else keyword substrings (with or without seniority hints around them)
+        return bool(t) and (t in titles or (search is not None and search(t) is not None))
+
     # Filter companies and retain only relevant employees (current role)
     filtered_companies = []
     companies = prospecting_result.get("items", [])
 
     for company in companies:
-        people = company.get("people", [])
+        # Only consider employees for role matching
+        employees = company.get("employees")
+        if employees is None:
+            employees = [p for p in company.get("people", []) if p.get("role") == "employee"]
 
         matched_employees: List[Dict[str, Any]] = []
 
-        for person in people:
-            # Only consider employees for role matching
-            if person.get("role") != "employee":
-                continue
-
-            positions = person.get("positionList", [])
-            if not positions:
-                continue
-
-            # Determine current position: prefer one without endDate; fallback to first
-            current_position = None
-            for pos in positions:
-                if not pos.get("endDate"):
-                    current_position = pos
-                    break
-            if current_position is None:
-                current_position = positions[0]
-
-            title = (current_position or {}).get("title", "")
-            title_l = (title or "").lower()
-
-            def matches_role(t: str) -> bool:
-                if not t:
-                    return False
-                # Exact title list
-                if t in target_titles:
-                    return True
-                # Keyword substrings
-                for kw in target_keywords:
-                    if kw in t:
-                        return True
-                # If exact term present with seniority hints
-                for base in target_keywords:
-                    for s in SENIORITY_HINTS:
-                        if f"{s} {base}" in t or f"{base} {s}" in t:
-                            return True
-                return False
+        for person in employees:
+            # Titles are resolved and lowercased once at enrichment; fall back for other callers
+            title_l = person.get("_title_l")
+            if title_l is None:
+                title = _current_title(person)
+                title_l = title.lower()
+            else:
+                title = person.get("currentTitle", "")
 
             if title and matches_role(title_l):
                 # Ensure we store personId and currentTitle for later export/contact lookup
-                person_data = person.get("person", {})
+                person_data = person.get("person") or _EMPTY_DICT
                 person_id = person_data.get("id") or person.get("id")
-                enriched_person = {**person}
+                enriched_person = person.copy()
                 if person_id:
                     enriched_person["personId"] = person_id
                 if title:
@@ -550,13 +625,13 @@ def role_filters(prospecting_result: Dict[str, Any], roles_of_interest: List[str
 
         if matched_employees:
             # Keep company but only with matched employees and updated counts
-            updated_company = {
-                **company,
-                "people": matched_employees,
-                "founders_count": 0,  # only returning relevant employees per request
-                "employees_count": len(matched_employees),
-                "total_people": len(matched_employees),
-            }
+            updated_company = company.copy()
+            updated_company["people"] = matched_employees
+            updated_company["founders"] = []
+            updated_company["employees"] = matched_employees
+            updated_company["founders_count"] = 0  # only returning relevant employees per request
+            updated_company["employees_count"] = len(matched_employees)
+            updated_company["total_people"] = len(matched_employees)
             filtered_companies.append(updated_company)
 
     logger.info(
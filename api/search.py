@@ -1,17 +1,83 @@
-import os
-import requests
 import io
 import logging
-import json
-from dotenv import load_dotenv
-
-load_dotenv()
+import hashlib
+import orjson
+from api import aviato_client
+from api.cache import TTLCache, register
 
 logger = logging.getLogger(__name__)
-aviato_api = os.environ.get("AVIATO_API_KEY")
 
-def search_aviato_companies(search_filters):
+# Slack users repeat the same searches; serve identical DSL payloads from memory
+# for a few minutes. Responses can hold thousands of companies, so keep few.
+SEARCH_CACHE_TTL = 5 * 60  # seconds
+_search_cache = register(TTLCache(maxsize=32, ttl=SEARCH_CACHE_TTL))
+
+_COMPANY_SEARCH_URL = "https://data.api.aviato.co/company/search"
+_PERSON_SEARCH_URL = "https://data.api.aviato.co/person/search"
+# Authorization and Accept-Encoding (gzip/deflate, br when available) come from the
+# shared Aviato session; requests decompresses and orjson parses the raw bytes
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 10000  # largest page the search endpoint accepts
+# (connect, read) seconds; Slack handlers wait on these, so give up well before the default
+SEARCH_TIMEOUT = (5, 10)
+
+
+def _eq(key, value):
+    return [{key: {"operation": "eq", "value": value}}]
+
+
+def _in(key, value):
+    return [{key: {"operation": "in", "value": value}}]
+
+
+def _eq_or_in(key, value):
+    # Support both a single value and a list of values
+    return _in(key, value) if isinstance(value, list) else _eq(key, value)
+
+
+def _each_eq(key, value):
+    # Apply AND between values: one eq filter per value
+    if isinstance(value, list):
+        return [{key: {"operation": "eq", "value": v}} for v in value]
+    return _eq(key, value)
+
+
+def _funding(key, value):
+    # Handle both old format (int, defaults to lte) and new format (dict with operation)
+    if isinstance(value, dict):
+        return [{key: {"operation": value.get("operation", "lte"), "value": value.get("value")}}]
+    return [{key: {"operation": "lte", "value": value}}]
+
+
+def _founded(key, value):
+    # A bare year (int or 4-digit string) becomes the end of that year in ISO datetime format
+    if isinstance(value, int) or (isinstance(value, str) and len(value) == 4 and value.isdigit()):
+        value = f"{value}-12-31T23:59:59Z"
+    return [{key: {"operation": "gte", "value": value}}]
+
+
+# search_filters key -> builder for its DSL filter conditions, in the order they are emitted
+_FILTER_SPEC = (
+    ("country", _eq),
+    ("region", _eq_or_in),
+    ("locality", _eq_or_in),
+    ("locationIDList", _in),
+    ("industryList", _each_eq),
+    ("website", _eq),
+    ("linkedin", _eq),
+    ("twitter", _eq),
+    ("totalFunding", _funding),
+    ("founded", _founded),
+)
+
+def search_aviato_companies(search_filters, limit=DEFAULT_SEARCH_LIMIT, offset=0):
     """
+    Search companies, sorted by total funding (descending). Returns one page of
+    at most `limit` results (capped at MAX_SEARCH_LIMIT) starting at `offset`;
+    use iter_all_companies to walk every page.
+
     Sample search filter:
     {
         "filter": {
@@ -22,12 +88,12 @@ def search_aviato_companies(search_filters):
         }
       }
     """
-    logger.info(f"Starting company search with filters: {search_filters}")
+    logger.info("Starting company search with filters: %s", search_filters)
     
     # Base DSL
     dsl = {
-        "offset": 0,
-        "limit": 10000,
+        "offset": offset,
+        "limit": min(limit, MAX_SEARCH_LIMIT),
         # Always sort by funding descending
         "sort": [{"totalFunding": "desc"}]
     }
@@ -35,111 +101,72 @@ def search_aviato_companies(search_filters):
     # Optional: add nameQuery if provided
     if "nameQuery" in search_filters:
         dsl["nameQuery"] = search_filters["nameQuery"]
-        logger.info(f"Added nameQuery: {search_filters['nameQuery']}")
+        logger.debug("Added nameQuery: %s", search_filters["nameQuery"])
 
-    logger.info("Applying sort: totalFunding desc")
+    logger.debug("Applying sort: totalFunding desc")
 
     # Build filters dynamically
     filter_conditions = []
-    if "country" in search_filters:
-        filter_conditions.append({"country": {"operation": "eq", "value": search_filters["country"]}})
-        logger.info(f"Added country filter: {search_filters['country']}")
-    if "region" in search_filters:
-        # Support both single region and multiple regions
-        region_value = search_filters["region"]
-        if isinstance(region_value, list):
-            filter_conditions.append({"region": {"operation": "in", "value": region_value}})
-        else:
-            filter_conditions.append({"region": {"operation": "eq", "value": region_value}})
-        logger.info(f"Added region filter: {region_value}")
-    if "locality" in search_filters:
-        # Support both single locality and multiple localities
-        locality_value = search_filters["locality"]
-        if isinstance(locality_value, list):
-            filter_conditions.append({"locality": {"operation": "in", "value": locality_value}})
-        else:
-            filter_conditions.append({"locality": {"operation": "eq", "value": locality_value}})
-        logger.info(f"Added locality filter: {locality_value}")
-    if "locationIDList" in search_filters:
-        filter_conditions.append({"locationIDList": {"operation": "in", "value": search_filters["locationIDList"]}})
-        logger.info(f"Added locationIDList filter: {search_filters['locationIDList']}")
-    if "industryList" in search_filters:
-        # Apply AND between industries: create one eq filter per industry value
-        industries_value = search_filters["industryList"]
-        if isinstance(industries_value, list):
-            for industry in industries_value:
-                filter_conditions.append({"industryList": {"operation": "eq", "value": industry}})
-            logger.info(f"Added industryList filters (AND across industries): {industries_value}")
-        else:
-            filter_conditions.append({"industryList": {"operation": "eq", "value": industries_value}})
-            logger.info(f"Added industryList filter: {industries_value}")
-    if "website" in search_filters:
-        filter_conditions.append({"website": {"operation": "eq", "value": search_filters["website"]}})
-        logger.info(f"Added website filter: {search_filters['website']}")
-    if "linkedin" in search_filters:
-        filter_conditions.append({"linkedin": {"operation": "eq", "value": search_filters["linkedin"]}})
-        logger.info(f"Added linkedin filter: {search_filters['linkedin']}")
-    if "twitter" in search_filters:
-        filter_conditions.append({"twitter": {"operation": "eq", "value": search_filters["twitter"]}})
-        logger.info(f"Added twitter filter: {search_filters['twitter']}")
-    if "totalFunding" in search_filters:
-        funding_filter = search_filters["totalFunding"]
-        # Handle both old format (int) and new format (dict with operation)
-        if isinstance(funding_filter, dict):
-            operation = funding_filter.get("operation", "lte")
-            value = funding_filter.get("value")
-            filter_conditions.append({"totalFunding": {"operation": operation, "value": value}})
-            logger.info(f"Added totalFunding filter ({operation}): {value}")
-        else:
-            # Backward compatibility: default to lte
-            filter_conditions.append({"totalFunding": {"operation": "lte", "value": funding_filter}})
-            logger.info(f"Added totalFunding filter (lte): {funding_filter}")
-    if "founded" in search_filters:
-        # Handle founded date - convert year to ISO datetime format for comparison
-        founded_value = search_filters["founded"]
-        if isinstance(founded_value, int):
-            # If it's a year, convert to end of year datetime for "lte" comparison
-            founded_value = f"{founded_value}-12-31T23:59:59Z"
-        elif isinstance(founded_value, str) and len(founded_value) == 4 and founded_value.isdigit():
-            # If it's a year string, convert to end of year datetime
-            founded_value = f"{founded_value}-12-31T23:59:59Z"
-        
-        filter_conditions.append({"founded": {"operation": "gte", "value": founded_value}})
-        logger.info(f"Added founded filter (gte): {founded_value}")
+    for key, build in _FILTER_SPEC:
+        if key in search_filters:
+            conditions = build(key, search_filters[key])
+            filter_conditions.extend(conditions)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Added %s filter: %s", key, conditions)
     
     # Wrap filters in AND structure if any exist
     if filter_conditions:
         dsl["filters"] = [{"AND": filter_conditions}]
-        logger.info(f"Built {len(filter_conditions)} filter conditions")
+        logger.debug("Built %s filter conditions", len(filter_conditions))
     else:
         logger.warning("No filter conditions built from search_filters")
 
     payload = {"dsl": dsl}
-    logger.info(f"Final DSL payload: {json.dumps(payload, indent=2)}")
-
-    url = "https://data.api.aviato.co/company/search"
-
-    headers = {
-        "Authorization": f"Bearer {aviato_api}" if aviato_api else "None",
-        "Content-Type": "application/json"
-    }
-    logger.info(f"Making API request to: {url}")
-    logger.info(f"Headers (API key masked): {headers}")
-
-    response = requests.post(url, headers=headers, json=payload)
-    logger.info(f"API response status: {response.status_code}")
+    body = orjson.dumps(payload)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Final DSL payload: %s", body.decode())
+
+    cache_key = hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Serving company search from cache")
+        # The cache holds the raw response bytes; parsing them gives every caller its
+        # own items and company dicts, which prospecting and the bot go on to modify
+        return orjson.loads(cached)
+
+    logger.debug("Making API request to: %s", _COMPANY_SEARCH_URL)
+
+    response = aviato_client.post(_COMPANY_SEARCH_URL, headers=_JSON_HEADERS, data=body, timeout=SEARCH_TIMEOUT)
+    if response is None:
+        logger.error("Company search skipped: Aviato search endpoint is failing")
+        return None
+    logger.debug("API response status: %s", response.status_code)
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         companies_count = len(data.get('items', [])) if data else 0
-        logger.info(f"API returned {companies_count} companies")
+        logger.info("API returned %s companies", companies_count)
         if companies_count == 0:
-            logger.warning(f"No companies found. Data response length: {len(data)}. Data response keys: {data.keys()} ")
+            logger.warning("No companies found. Data response length: %s. Data response keys: %s", len(data), list(data.keys()) if data else [])
+        elif isinstance(data, dict):
+            _search_cache.set(cache_key, response.content)
         return data
     else:
-        logger.error(f"API error: Status {response.status_code} | Response: {response.text[:500]}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error("API error: Status %s | Response: %s", response.status_code, response.text[:500])
         return None
 
+def iter_all_companies(search_filters, page_size=500):
+    """Yield every company matching `search_filters`, fetching `page_size` at a time."""
+    offset = 0
+    while True:
+        result = search_aviato_companies(search_filters, limit=page_size, offset=offset)
+        items = (result or {}).get("items") or []
+        yield from items
+        if len(items) < page_size:
+            return
+        offset += page_size
+
 def search_aviato_profiles(search_filters):
     # Base DSL
     dsl = {
@@ -170,17 +197,14 @@ def search_aviato_profiles(search_filters):
 
     payload = {"dsl": dsl}
 
-    url = "https://data.api.aviato.co/person/search"
-
-    headers = {
-        "Authorization": f"Bearer {aviato_api}",
-        "Content-Type": "application/json"
-    }
-
-    response = requests.post(url, headers=headers, json=payload)
+    response = aviato_client.post(
+        _PERSON_SEARCH_URL, headers=_JSON_HEADERS, data=orjson.dumps(payload), timeout=SEARCH_TIMEOUT
+    )
+    if response is None:
+        return None
 
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         return data
     else:
         logger.error("Profile search error: %s | %s", response.status_code, response.text[:200])
@@ -8,6 +8,11 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from slack.bot import SlackBot
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,4 +35,7 @@ async def main():
         await bot.stop()
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        # libuv-based event loop: cheaper socket I/O for the Socket Mode connection and handlers
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
\ No newline at end of file
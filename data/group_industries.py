@@ -1,159 +1,219 @@
-import json
-from collections import defaultdict
+import re
+import sys
+import heapq
+import functools
+import orjson
+from multiprocessing import Pool
+from operator import itemgetter
 
 # Define industry groupings based on common patterns and related fields
 INDUSTRY_GROUPS = {
-    "Technology & Software": [
+    "Technology & Software": (
         "software", "information technology", "it services", "it consulting",
         "saas", "cloud", "internet", "web", "mobile", "app", "digital",
         "tech", "data", "ai", "artificial intelligence", "machine learning",
         "blockchain", "crypto", "cybersecurity", "cyber security", "network",
         "database", "developer", "programming", "coding", "Information Services", "analytics", "computer"
-    ],
-    "Healthcare & Medical": [
+    ),
+    "Healthcare & Medical": (
         "health care", "medical", "hospital", "pharmaceutical", "biotechnology",
         "therapeutics", "dental", "clinic", "wellness", "fitness", "mental health",
         "diagnostic", "medical device", "biopharma", "drug", "healthcare", "health", "personal health"
-    ],
-    "Financial Services": [
+    ),
+    "Financial Services": (
         "financial services", "finance", "banking", "insurance", "fintech",
         "investment", "venture capital", "asset management", "wealth management",
         "lending", "payments", "credit", "mortgage", "accounting", "tax", "risk management"
-    ],
-    "Manufacturing & Industrial": [
+    ),
+    "Manufacturing & Industrial": (
         "manufacturing", "industrial", "machinery", "automotive", "electronics",
         "chemical", "metal", "textile", "equipment", "fabrication", "assembly",
         "production", "factory", "commercial", "hardware", "mining", "aerospace", "robotics", "infrastructure"
-    ],
-    "Retail & E-Commerce": [
-        "retail", "e-commerce", "ecommerce", "wholesale", "shopping", "marketplace", "crm", "wine and spirits", "lifestyle"
+    ),
+    "Retail & E-Commerce": (
+        "retail", "e-commerce", "ecommerce", "wholesale", "shopping", "marketplace", "crm", "wine and spirits", "lifestyle",
         "store", "consumer goods", "fashion", "apparel", "clothing", "Consumer", "furniture", "cosmetics", "beauty"
-    ],
-    "Marketing & Advertising": [
+    ),
+    "Marketing & Advertising": (
         "marketing", "advertising", "brand", "digital marketing", "social media",
         "seo", "content", "creative", "agency", "public relations", "pr"
-    ],
-    "Real Estate & Construction": [
+    ),
+    "Real Estate & Construction": (
         "real estate", "construction", "property", "building", "architecture",
         "engineering", "civil engineering", "residential", "commercial real estate"
-    ],
-    "Food & Beverage": [
+    ),
+    "Food & Beverage": (
         "food", "beverage", "restaurant", "catering", "bakery", "brewery",
         "winery", "coffee", "organic food", "snack"
-    ],
-    "Education & Training": [
+    ),
+    "Education & Training": (
         "education", "training", "e-learning", "edtech", "school", "university",
         "tutoring", "coaching", "professional training", "learning"
-    ],
-    "Professional Services": [
+    ),
+    "Professional Services": (
         "consulting", "professional services", "business consulting", "legal", "sales", "business development",
         "law", "management consulting", "advisory", "strategy", "advice", "graphic design", "customer service", "business intelligence"
-    ],
-    "Transportation & Logistics": [
+    ),
+    "Transportation & Logistics": (
         "transportation", "logistics", "shipping", "freight", "delivery",
         "supply chain", "warehousing", "trucking", "aviation", "maritime"
-    ],
-    "Energy & Utilities": [
+    ),
+    "Energy & Utilities": (
         "energy", "oil and gas", "renewable energy", "solar", "utilities",
         "power", "electric", "wind", "nuclear", "clean energy"
-    ],
-    "Media & Entertainment": [
+    ),
+    "Media & Entertainment": (
         "media", "entertainment", "publishing", "broadcasting", "film",
         "music", "gaming", "video", "news", "sports", "events"
-    ],
-    "Telecommunications": [
+    ),
+    "Telecommunications": (
         "telecommunications", "telecom", "wireless", "voip", "network",
         "internet service", "cable", "satellite"
-    ],
-    "Agriculture": [
+    ),
+    "Agriculture": (
         "agriculture", "farming", "agtech", "cultivation", "livestock",
         "dairy", "aquaculture", "forestry"
-    ],
-    "Non-Profit & Social": [
+    ),
+    "Non-Profit & Social": (
         "non profit", "nonprofit", "charity", "social", "civic", "philanthropy",
         "humanitarian", "community", "advocacy"
-    ],
-    "Hospitality & Travel": [
+    ),
+    "Hospitality & Travel": (
         "hospitality", "hotel", "travel", "tourism", "restaurant", "resort",
         "accommodation", "leisure"
-    ],
-    "Human Resources": [
+    ),
+    "Human Resources": (
         "human resources", "hr", "recruiting", "staffing", "talent",
         "employment", "payroll", "workforce"
-    ],
-    "Security": [
+    ),
+    "Security": (
         "security", "physical security", "surveillance", "access control",
         "fire protection", "law enforcement"
-    ],
-    "Environmental Services": [
+    ),
+    "Environmental Services": (
         "environmental", "waste management", "recycling", "sustainability",
         "water", "pollution", "cleantech", "green"
-    ]
+    )
+}
+
+
+# One compiled alternation per group, in priority order; keywords are lowercased
+# to match the lowercased industry name. Plain substring matching, no word
+# boundaries, same as the original `keyword in name` checks.
+_GROUP_PATTERNS = tuple(
+    (group, re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords)))
+    for group, keywords in INDUSTRY_GROUPS.items()
+)
+
+
+def _scan_keywords(industry_lower):
+    for group, pattern in _GROUP_PATTERNS:
+        if pattern.search(industry_lower):
+            return group
+    return "Other"
+
+
+# Industry names that are exactly a keyword ("Software", "Retail", ...) are the
+# most common case; resolve those with one lookup. Values come from the same
+# scan, so an earlier group's keyword inside the name still takes priority.
+KEYWORD_TO_GROUP = {
+    keyword.lower(): _scan_keywords(keyword.lower())
+    for keywords in INDUSTRY_GROUPS.values()
+    for keyword in keywords
 }
 
 
+# Pure function of its string argument over static keyword tables, so repeats are free
+@functools.lru_cache(maxsize=None)
 def categorize_industry(industry_name):
     """
     Categorize an industry into a major group based on keywords.
-    Returns the group name or None if no match.
+    Returns the group name, or "Other" if no keyword matches.
     """
     industry_lower = industry_name.lower()
-    
-    for group, keywords in INDUSTRY_GROUPS.items():
-        for keyword in keywords:
-            if keyword in industry_lower:
-                return group
-    
-    return "Other"
+    group = KEYWORD_TO_GROUP.get(industry_lower)
+    if group is not None:
+        return group
+    return _scan_keywords(industry_lower)
 
 
-def group_industries(input_file, output_file, min_count=5):
+def group_industries(input_file, output_file, min_count=5, top_k=None, processes=None):
     """
     Read industries from input file, group them, filter by min count,
     and write to output file.
+
+    With top_k, only the top_k largest industries are kept in each category
+    (industry_count still reports the full number). With processes,
+    categorization is spread over a pool of that many worker processes.
     """
     # Read the input file
-    with open(input_file, 'r', encoding='utf-8') as f:
-        industries = json.load(f)
+    with open(input_file, 'rb') as f:
+        industries = orjson.loads(f.read())
     
     # Filter industries with at least min_count companies
     filtered_industries = [
         ind for ind in industries 
         if ind['doc_count'] >= min_count
     ]
+    total_industries = len(industries)
+    # Drop the full list now rather than holding it through grouping
+    del industries
     
-    print(f"Filtered from {len(industries)} to {len(filtered_industries)} industries (>= {min_count} companies)")
+    print(f"Filtered from {total_industries} to {len(filtered_industries)} industries (>= {min_count} companies)")
     
     # Group industries by category
-    grouped = defaultdict(lambda: {"industries": [], "total_count": 0})
+    grouped = {
+        category: {"industries": [], "total_count": 0}
+        for category in (*INDUSTRY_GROUPS, "Other")
+    }
+    
+    # Names differing only in case categorize the same way; do each one once
+    lowered = [sys.intern(industry['key'].lower()) for industry in filtered_industries]
+    unique_keys = list(dict.fromkeys(lowered))
+    if processes:
+        # imap keeps input order so results line up with unique_keys
+        with Pool(processes) as pool:
+            categories = pool.imap(categorize_industry, unique_keys, chunksize=1024)
+            cat_for_key = dict(zip(unique_keys, categories))
+    else:
+        cat_for_key = {key: categorize_industry(key) for key in unique_keys}
     
-    for industry in filtered_industries:
-        category = categorize_industry(industry['key'])
-        grouped[category]["industries"].append({
+    for industry, key in zip(filtered_industries, lowered):
+        entry = grouped[cat_for_key[key]]
+        entry["industries"].append({
             "name": industry['key'],
             "count": industry['doc_count']
         })
-        grouped[category]["total_count"] += industry['doc_count']
+        entry["total_count"] += industry['doc_count']
     
     # Sort industries within each group by count
+    by_count = itemgetter('count')
     for category in grouped:
-        grouped[category]["industries"].sort(key=lambda x: x['count'], reverse=True)
+        industries = grouped[category]["industries"]
+        grouped[category]["industry_count"] = len(industries)
+        if top_k is None:
+            industries.sort(key=by_count, reverse=True)
+        else:
+            grouped[category]["industries"] = heapq.nlargest(top_k, industries, key=by_count)
     
     # Convert to list and sort by total count
     result = []
     for category, data in grouped.items():
+        if not data["industries"]:
+            continue
         result.append({
             "category": category,
             "total_companies": data["total_count"],
-            "industry_count": len(data["industries"]),
+            "industry_count": data["industry_count"],
             "industries": data["industries"]
         })
     
-    result.sort(key=lambda x: x['total_companies'], reverse=True)
+    result.sort(key=itemgetter('total_companies'), reverse=True)
     
     # Write output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (no ASCII escaping, like ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
     
     # Print summary
     print(f"\nGrouped into {len(result)} categories:")
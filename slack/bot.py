@@ -1,13 +1,16 @@
 import asyncio
+import functools
 import os
 import logging
 import json
 import re
+import sys
 import csv
 import io
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from slack_sdk.socket_mode.aiohttp import SocketModeClient
 from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.http_retry.builtin_async_handlers import AsyncRateLimitErrorRetryHandler
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
 from dotenv import load_dotenv
@@ -19,6 +22,190 @@ load_dotenv()
 
 logger = logging.getLogger("slack_bot")
 
+# "<@U123ABC>" user mentions, stripped from app_mention text
+_MENTION_RE = re.compile(r'<@[A-Z0-9]+>')
+# Slack's auto-linked form "<https://example.com|example.com>"
+_SLACK_URL_RE = re.compile(r'<(https?://[^|>]+)\|[^>]+>')
+# Slack clients often turn typed quotes into curly ones
+_SMART_QUOTES = str.maketrans({"\u201c": '"', "\u201d": '"'})
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == "_"
+
+
+def _parse_params(s):
+    """Yield (key, value) pairs from search text like 'industry: "Software, AI" founded: 2021'.
+
+    A key is a run of word characters, then optional spaces and a colon; the value is
+    either a non-empty double-quoted string or a run of non-space characters. Anything
+    that doesn't fit is skipped. Lower-cases keys.
+    """
+    n = len(s)
+    pos = 0
+    while True:
+        colon = s.find(":", pos)
+        if colon < 0:
+            return
+        # Walk back from the colon over spaces, then over the key itself
+        key_end = colon
+        while key_end > pos and s[key_end - 1].isspace():
+            key_end -= 1
+        key_start = key_end
+        while key_start > pos and _is_word_char(s[key_start - 1]):
+            key_start -= 1
+        i = colon + 1
+        while i < n and s[i].isspace():
+            i += 1
+        if key_start == key_end or i == n:
+            pos = colon + 1
+            continue
+        key = s[key_start:key_end].lower()
+        if s[i] == '"':
+            close = s.find('"', i + 1)
+            if close > i + 1:
+                yield key, s[i + 1:close]
+                pos = close + 1
+                continue
+        # Bare value (or a quote with no closing partner): up to the next whitespace
+        end = i
+        while end < n and not s[end].isspace():
+            end += 1
+        yield key, s[i:end]
+        pos = end
+
+
+def _parse_int(value):
+    """int(value) for an optionally signed run of decimal digits, else None.
+
+    Checked up front so malformed input from users doesn't go through raising ValueError.
+    """
+    digits = value[1:] if value[:1] in ("-", "+") else value
+    return int(value) if digits.isdecimal() else None
+
+
+# How parse_search_params stores each recognized key; unknown keys are ignored
+def _set_param(filters, field, value):
+    filters[field] = value
+
+
+def _set_industries_param(filters, field, value):
+    # Split comma-separated industries and clean up quotes
+    filters[field] = [i.strip().strip('"\'') for i in value.split(',') if i.strip()]
+
+
+def _set_int_param(filters, field, value):
+    number = _parse_int(value)
+    if number is not None:
+        filters[field] = number
+
+
+# param key (lower-cased) -> (search filter field, handler)
+_PARAM_HANDLERS = {
+    "industry": ("industryList", _set_industries_param),
+    "industries": ("industryList", _set_industries_param),
+    "country": ("country", _set_param),
+    "region": ("region", _set_param),
+    "locality": ("locality", _set_param),
+    "funding": ("totalFunding", _set_int_param),
+    "totalfunding": ("totalFunding", _set_int_param),
+    "founded": ("founded", _set_int_param),
+}
+
+
+def _session_key(channel_id, thread_ts):
+    """Key for prospecting_sessions. Slack IDs repeat on every message in a
+    thread, so intern them and let lookups compare by identity."""
+    return (sys.intern(channel_id), sys.intern(thread_ts))
+
+
+_HTTP_SCHEMES = ('http://', 'https://')
+
+
+def _extract_website(urls_val):
+    """Pick a website out of a company's URLs field (list, dict or string), or None."""
+    # Parsed JSON only ever holds these exact types, so compare types directly
+    t = type(urls_val)
+    if t is list:
+        if not urls_val:
+            return None
+        first_item = urls_val[0]
+        if type(first_item) is str:
+            return first_item
+        if type(first_item) is dict:
+            return first_item.get('website') or first_item.get('url') or first_item.get('homepage')
+        return None
+    if t is dict:
+        website_candidate = urls_val.get('website') or urls_val.get('url') or urls_val.get('homepage')
+        if not website_candidate:
+            for v in urls_val.values():
+                if type(v) is str and v.startswith(_HTTP_SCHEMES):
+                    return v
+        return website_candidate
+    if t is str:
+        return urls_val
+    return None
+
+
+# Candidate search CSV columns in desired order (website right after name)
+_CSV_COLUMNS = ('name', 'website', 'industryList', 'locality', 'region', 'country')
+
+
+# company_map entry for contacts whose company isn't in the result
+_NO_COMPANY = (None, None)
+
+
+def _industry_text(industry_list):
+    """Flatten an industryList to one CSV cell, skipping empty entries; non-list values pass through."""
+    if isinstance(industry_list, list):
+        return ", ".join(map(str, filter(None, industry_list)))
+    return industry_list
+
+
+# (threshold, suffix) for abbreviating funding amounts, largest first
+_FUNDING_UNITS = ((1_000_000_000, "B"), (1_000_000, "M"))
+
+
+def _format_funding(amount):
+    if not amount or not isinstance(amount, (int, float)):
+        return "N/A"
+    for threshold, suffix in _FUNDING_UNITS:
+        if amount >= threshold:
+            return f"${amount/threshold:.1f}{suffix}"
+    return f"${amount:,}"
+
+
+def _format_date(date_str):
+    if not date_str:
+        return "N/A"
+    return date_str.split("-")[0]
+
+
+def _format_product(product):
+    """Format product to show only name and tagline."""
+    name = product.get("productName", "Unnamed Product")
+    tagline = product.get("tagline", "")
+    return f"- *{name}*: {tagline}" if tagline else f"- *{name}*"
+
+
+def _list_section(title, items, formatter=None, max_items=5):
+    """Build a list-based section, with optional custom formatting per item."""
+    lines = [formatter(item) if formatter else str(item) for item in items[:max_items]]
+    return {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": f"*{title}:*\n" + "\n".join(lines)}
+    }
+
+
+# (title, company field, item formatter) for the optional list sections, in display order
+_EXTRA_SECTIONS = (
+    ("Customer Types", "customerTypes", None),
+    ("Owned Patents", "ownedPatents", None),
+    ("Government Awards", "governmentAwards", None),
+    ("Products", "productList", _format_product),
+    ("Business Models", "businessModelList", None),
+)
+
 
 class SlackBot:
     def __init__(self):
@@ -29,22 +216,47 @@ class SlackBot:
             raise ValueError("SLACK_APP_TOKEN and SLACK_BOT_TOKEN must be set")
 
         self.web_client = AsyncWebClient(token=self.bot_token)
+        # On a 429, wait out Retry-After with asyncio.sleep and retry instead of failing the handler
+        self.web_client.retry_handlers.append(AsyncRateLimitErrorRetryHandler(max_retry_count=2))
         self.socket_mode_client = SocketModeClient(
             app_token=self.app_token,
             web_client=self.web_client
         )
         self.socket_mode_client.socket_mode_request_listeners.append(self.handle_socket_mode_request)
 
-        # In-memory session store for prospecting conversations
-        # Keyed by (channel_id, thread_ts)
+        # Dispatch tables: Socket Mode request type, Events API event type, and the
+        # first word of a "<command> <args>" message (DMs and mentions differ)
+        self._request_handlers = {
+            "slash_commands": self.handle_slash_command,
+            "events_api": self.handle_events_api,
+        }
+        self._event_handlers = {
+            "message": self.handle_message_event,
+            "app_mention": self.handle_app_mention,
+        }
+        self._dm_commands = {
+            "company": self.handle_company_enrichment,
+            "search": self.handle_company_search,
+        }
+        self._mention_commands = {
+            "company": self.handle_company_command,
+        }
+
+        # In-memory session store for prospecting conversations, keyed by
+        # _session_key(channel_id, thread_ts). Only touched from the event loop, so no lock.
         self.prospecting_sessions = {}
 
+        # The loop the bot runs on; set in start()
+        self._loop = None
+        # Threads for the synchronous Aviato calls and CSV builds, so concurrent
+        # prospecting jobs can't take over the loop's default executor
+        self._blocking_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="slackbot-blocking")
+
     async def handle_socket_mode_request(self, client: SocketModeClient, req: SocketModeRequest):
         try:
-            if req.type == "slash_commands":
-                await self.handle_slash_command(client, req)
-            elif req.type == "events_api":
-                await self.handle_events_api(client, req)
+            handler = self._request_handlers.get(req.type)
+            if handler is not None:
+                await handler(client, req)
             else:
                 response = SocketModeResponse(envelope_id=req.envelope_id)
                 await client.send_socket_mode_response(response)
@@ -75,10 +287,9 @@ class SlackBot:
         response = SocketModeResponse(envelope_id=req.envelope_id)
         await client.send_socket_mode_response(response)
 
-        if event_type == "message":
-            await self.handle_message_event(event)
-        elif event_type == "app_mention":
-            await self.handle_app_mention(event)
+        handler = self._event_handlers.get(event_type)
+        if handler is not None:
+            await handler(event)
 
     async def handle_message_event(self, event):
         if event.get("bot_id") or not event.get("text"):
@@ -91,22 +302,21 @@ class SlackBot:
         channel_type = event.get("channel_type")
 
         if channel_type == "im":
+            lt = text.lower()
             # Start prospecting flow
-            if text.lower().strip() == "prospecting":
+            if lt == "prospecting":
                 await self.handle_prospecting_start(channel_id, user_id, thread_ts)
                 return
 
             # If user is in an active prospecting session, handle response
-            if (channel_id, thread_ts) in self.prospecting_sessions:
+            if _session_key(channel_id, thread_ts) in self.prospecting_sessions:
                 await self.handle_prospecting_response(text, channel_id, user_id, thread_ts)
                 return
 
-            if text.lower().startswith("company "):
-                url = text[8:].strip()
-                await self.handle_company_enrichment(url, channel_id, user_id, thread_ts)
-            elif text.lower().startswith("search "):
-                search_params = text[7:].strip()
-                await self.handle_company_search(search_params, channel_id, user_id, thread_ts)
+            command, sep, args = text.partition(" ")
+            handler = self._dm_commands.get(command.lower()) if sep else None
+            if handler is not None:
+                await handler(args.strip(), channel_id, user_id, thread_ts)
 
     async def handle_app_mention(self, event):
         text = event.get("text", "").strip()
@@ -114,15 +324,17 @@ class SlackBot:
         user_id = event.get("user")
         thread_ts = event.get("thread_ts") or event.get("ts")
 
-        text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
+        text = _MENTION_RE.sub('', text).strip()
+        lt = text.lower()
+        command, sep, args = text.partition(" ")
+        handler = self._mention_commands.get(command.lower()) if sep else None
 
-        if text.lower() == "prospecting":
+        if lt == "prospecting":
             await self.handle_prospecting_start(channel_id, user_id, thread_ts)
-        elif (channel_id, thread_ts) in self.prospecting_sessions:
+        elif _session_key(channel_id, thread_ts) in self.prospecting_sessions:
             await self.handle_prospecting_response(text, channel_id, user_id, thread_ts)
-        elif text.lower().startswith("company "):
-            url = text[8:].strip()
-            await self.handle_company_command(url, channel_id, user_id, thread_ts)
+        elif handler is not None:
+            await handler(args.strip(), channel_id, user_id, thread_ts)
         elif not text:
             await self.web_client.chat_postMessage(
                 channel=channel_id,
@@ -132,7 +344,7 @@ class SlackBot:
 
     async def handle_prospecting_start(self, channel_id: str, user_id: str, thread_ts: str):
         """Initiate the prospecting conversational flow."""
-        self.prospecting_sessions[(channel_id, thread_ts)] = {
+        self.prospecting_sessions[_session_key(channel_id, thread_ts)] = {
             "stage": "awaiting_filters",
             "user_id": user_id,
             "filters_text": None,
@@ -167,7 +379,8 @@ class SlackBot:
 
     async def handle_prospecting_response(self, text: str, channel_id: str, user_id: str, thread_ts: str):
         """Continue the prospecting flow based on current session stage."""
-        session = self.prospecting_sessions.get((channel_id, thread_ts))
+        key = _session_key(channel_id, thread_ts)
+        session = self.prospecting_sessions.get(key)
         if not session:
             return
 
@@ -195,7 +408,7 @@ class SlackBot:
             session["stage"] = "running"
             await self.run_prospecting(channel_id, user_id, thread_ts, session)
             # Cleanup
-            self.prospecting_sessions.pop((channel_id, thread_ts), None)
+            self.prospecting_sessions.pop(key, None)
             return
 
     async def run_prospecting(self, channel_id: str, user_id: str, thread_ts: str, session: dict):
@@ -210,8 +423,9 @@ class SlackBot:
         )
 
         try:
-            # Run synchronous prospecting in a thread to avoid blocking the event loop
-            result = await asyncio.to_thread(prospect_companies, filters_text, True, 200, roles)
+            # Run synchronous prospecting in a thread to avoid blocking the event loop.
+            # No contextvars are in play, so skip to_thread's copy_context() wrapper.
+            result = await self._loop.run_in_executor(self._blocking_pool, prospect_companies, filters_text, True, 200, roles)
 
             items = (result or {}).get("items", [])
             contacts = (result or {}).get("contacts", [])
@@ -224,37 +438,24 @@ class SlackBot:
                 )
                 return
 
-            # Build CSV content
-            csv_content = self.create_prospecting_csv(result)
+            # Build CSV content off the loop; thousands of contacts take a noticeable while
+            csv_file = await self._loop.run_in_executor(self._blocking_pool, self.create_prospecting_csv, result)
 
-            # Write and upload CSV
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as temp_file:
-                temp_file.write(csv_content)
-                temp_file_path = temp_file.name
-
-            filename = f"prospecting_results_{len(items)}_companies_{len(contacts)}_contacts.csv"
-            try:
-                with open(temp_file_path, "rb") as file_content:
-                    await self.web_client.files_upload_v2(
-                        channel=channel_id,
-                        thread_ts=thread_ts,
-                        file=file_content,
-                        filename=filename,
-                        title="Prospecting Results",
-                    )
-            finally:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-
-            # Post summary message
+            # Summary goes out as the upload's comment rather than a second message
             contacts_count = (result or {}).get("contacts_count") or len(contacts)
             note_parts = [
                 f"Found {contacts_count} contacts at {len(items)} companies" if contacts_count else "no contacts"
             ]
-            await self.web_client.chat_postMessage(
+
+            # Upload CSV straight from memory
+            filename = f"prospecting_results_{len(items)}_companies_{len(contacts)}_contacts.csv"
+            await self.web_client.files_upload_v2(
                 channel=channel_id,
                 thread_ts=thread_ts,
-                text=", ".join(note_parts) + ". See CSV for details.",
+                file=csv_file,
+                filename=filename,
+                title="Prospecting Results",
+                initial_comment=", ".join(note_parts) + ". See CSV for details.",
             )
 
         except Exception as e:
@@ -265,53 +466,24 @@ class SlackBot:
                 text=f"Error during prospecting: {str(e)}",
             )
 
-    def create_prospecting_csv(self, result: dict) -> str:
-        """Create CSV with company + contact info.
+    def create_prospecting_csv(self, result: dict) -> io.BytesIO:
+        """Create CSV with company + contact info, as a UTF-8 buffer ready to upload.
         If contacts are present, output one row per contact.
         Otherwise, output one row per company.
         """
-        output = io.StringIO()
-        writer = None
+        # Encode as rows are written rather than building a str and encoding it after
+        buf = io.BytesIO()
+        output = io.TextIOWrapper(buf, encoding="utf-8", newline="", write_through=True)
 
         items = (result or {}).get("items", [])
         contacts = (result or {}).get("contacts", [])
         
-        # Build helper map from companyId -> {website, industryList, locality, region, country, totalFunding}
+        # companyId -> (website, totalFunding), to fill what contacts lack
         company_map = {}
         for company in items:
-            c = dict(company)
             # Normalize website like in create_csv_from_results
-            if not c.get('website'):
-                urls_val = c.get('URLs')
-                website_candidate = None
-                try:
-                    if isinstance(urls_val, list) and urls_val:
-                        first_item = urls_val[0]
-                        if isinstance(first_item, str):
-                            website_candidate = first_item
-                        elif isinstance(first_item, dict):
-                            website_candidate = first_item.get('website') or first_item.get('url') or first_item.get('homepage')
-                    elif isinstance(urls_val, dict):
-                        website_candidate = urls_val.get('website') or urls_val.get('url') or urls_val.get('homepage')
-                        if not website_candidate:
-                            for v in urls_val.values():
-                                if isinstance(v, str) and v.startswith(('http://', 'https://')):
-                                    website_candidate = v
-                                    break
-                    elif isinstance(urls_val, str):
-                        website_candidate = urls_val
-                except Exception:
-                    website_candidate = None
-                if website_candidate:
-                    c['website'] = website_candidate
-            company_map[c.get('id')] = {
-                'website': c.get('website'),
-                'industryList': c.get('industryList'),
-                'locality': c.get('locality'),
-                'region': c.get('region'),
-                'country': c.get('country'),
-                'totalFunding': c.get('totalFunding'),
-            }
+            website = company.get('website') or _extract_website(company.get('URLs'))
+            company_map[company.get('id')] = (website, company.get('totalFunding'))
 
         if contacts:
             # Columns for contact-enriched export
@@ -330,38 +502,50 @@ class SlackBot:
                 "workEmail",
                 "personalEmail",
             ]
-            writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
-            writer.writeheader()
+            writer = csv.writer(output)
+            writer.writerow(columns)
             for c in contacts:
-                row = c.copy()
-                # Fill website from company map when missing
-                if not row.get('website'):
-                    cm = company_map.get(row.get('companyId'))
-                    if cm and cm.get('website'):
-                        row['website'] = cm.get('website')
-                # Fill totalFunding from company map when missing
-                if row.get('totalFunding') in (None, ""):
-                    cm = company_map.get(row.get('companyId'))
-                    if cm and cm.get('totalFunding') is not None:
-                        row['totalFunding'] = cm.get('totalFunding')
-                # Normalize industry list to string for CSV
-                il = row.get("industryList")
-                if isinstance(il, list):
-                    row["industryList"] = ", ".join([str(x) for x in il if x is not None])
-                writer.writerow(row)
+                # Contacts carry no website; take it (and missing funding) from the company map
+                website, company_funding = company_map.get(c.companyId, _NO_COMPANY)
+                total_funding = c.totalFunding
+                if total_funding in (None, "") and company_funding is not None:
+                    total_funding = company_funding
+                writer.writerow((
+                    c.company,
+                    website,
+                    _industry_text(c.industryList),
+                    c.companyLocality,
+                    c.companyRegion,
+                    c.companyCountry,
+                    total_funding,
+                    c.name,
+                    c.title,
+                    c.linkedin,
+                    c.email,
+                    c.workEmail,
+                    c.personalEmail,
+                ))
         else:
             # Fallback: company-only export
             columns = ["name", "website", "industryList", "locality", "region", "country", "totalFunding"]
-            writer = csv.DictWriter(output, fieldnames=columns, extrasaction="ignore")
-            writer.writeheader()
+            writer = csv.writer(output)
+            writer.writerow(columns)
             for company in items:
-                row = company.copy()
-                il = row.get("industryList")
-                if isinstance(il, list):
-                    row["industryList"] = ", ".join([str(x) for x in il if x is not None])
-                writer.writerow(row)
-
-        return output.getvalue()
+                writer.writerow((
+                    company.get("name"),
+                    company.get("website"),
+                    _industry_text(company.get("industryList")),
+                    company.get("locality"),
+                    company.get("region"),
+                    company.get("country"),
+                    company.get("totalFunding"),
+                ))
+
+        output.flush()
+        # Detach so the wrapper doesn't close buf when it is garbage collected
+        output.detach()
+        buf.seek(0)
+        return buf
 
     async def handle_company_command(self, text: str, channel_id: str, user_id: str, thread_ts: str = None):
         if not text:
@@ -373,10 +557,12 @@ class SlackBot:
             return
 
         try:
+            # Enrichment makes several blocking Aviato calls; keep them off the event loop
             if "linkedin.com/company" in text.lower():
-                company_data = complete_company_enrichment(company_linkedin_url=text)
+                enrich = functools.partial(complete_company_enrichment, company_linkedin_url=text)
             else:
-                company_data = complete_company_enrichment(company_website=text)
+                enrich = functools.partial(complete_company_enrichment, company_website=text)
+            company_data = await self._loop.run_in_executor(self._blocking_pool, enrich)
 
             if not company_data:
                 await self.web_client.chat_postMessage(
@@ -412,16 +598,18 @@ class SlackBot:
             return
 
         try:
-            match = re.search(r'<(https?://[^|>]+)\|[^>]+>', url)
+            match = _SLACK_URL_RE.search(url)
             if match:
                 url = match.group(1)
-            elif not url.startswith(('http://', 'https://')):
+            elif not url.startswith(_HTTP_SCHEMES):
                 url = 'https://' + url
 
+            # Enrichment makes several blocking Aviato calls; keep them off the event loop
             if "linkedin.com/company" in url.lower():
-                company_data = complete_company_enrichment(company_linkedin_url=url)
+                enrich = functools.partial(complete_company_enrichment, company_linkedin_url=url)
             else:
-                company_data = complete_company_enrichment(company_website=url)
+                enrich = functools.partial(complete_company_enrichment, company_website=url)
+            company_data = await self._loop.run_in_executor(self._blocking_pool, enrich)
 
             if not company_data:
                 await self.web_client.chat_postMessage(
@@ -449,32 +637,11 @@ class SlackBot:
 
     def format_company_blocks(self, company_data: dict) -> list:
         """Format enriched company data into a Slack Block Kit message."""
-
-        def format_funding(amount):
-            if not amount or not isinstance(amount, (int, float)):
-                return "N/A"
-            if amount >= 1_000_000_000:
-                return f"${amount/1_000_000_000:.1f}B"
-            if amount >= 1_000_000:
-                return f"${amount/1_000_000:.1f}M"
-            return f"${amount:,}"
-
-        def format_date(date_str):
-            if not date_str:
-                return "N/A"
-            return date_str.split("-")[0]
-
-        def format_product(product):
-            """Format product to show only name and tagline."""
-            name = product.get("productName", "Unnamed Product")
-            tagline = product.get("tagline", "")
-            return f"- *{name}*: {tagline}" if tagline else f"- *{name}*"
-
         name = company_data.get("name", "Unknown Company")
         legal_name = company_data.get("legalName")
         desc = company_data.get("description", "")
-        founded = format_date(company_data.get("founded"))
-        funding = format_funding(company_data.get("totalFunding"))
+        founded = _format_date(company_data.get("founded"))
+        funding = _format_funding(company_data.get("totalFunding"))
         funding_rounds = company_data.get("fundingRoundCount")
         investor_names = [i["name"] for i in company_data.get("investors", []) if i.get("name")]
         if investor_names:
@@ -501,25 +668,20 @@ class SlackBot:
             header_text = f"{name} ({legal_name})"
         blocks.append({"type": "header", "text": {"type": "plain_text", "text": header_text, "emoji": False}})
 
-        # Core facts
-        fields = []
-        if founded != "N/A":
-            fields.append({"type": "mrkdwn", "text": f"*Founded:*\n{founded}"})
+        # Core facts, as (label, value); empty values are left out
+        fund_text = None
         if funding != "N/A":
-            fund_text = funding
-            if funding_rounds:
-                fund_text += f" ({funding_rounds} rounds)"
-            fields.append({"type": "mrkdwn", "text": f"*Funding:*\n{fund_text}"})
-        if investors:
-            fields.append({"type": "mrkdwn", "text": f"*Investors:*\n{investors}"})
-        if location:
-            fields.append({"type": "mrkdwn", "text": f"*Location:*\n{location}"})
-        if industries != "N/A":
-            fields.append({"type": "mrkdwn", "text": f"*Industries:*\n{industries}"})
-        if traffic:
-            fields.append({"type": "mrkdwn", "text": f"*Web Traffic:*\n{traffic}"})
-        if status:
-            fields.append({"type": "mrkdwn", "text": f"*Status:*\n{status}"})
+            fund_text = f"{funding} ({funding_rounds} rounds)" if funding_rounds else funding
+        facts = (
+            ("Founded", founded if founded != "N/A" else None),
+            ("Funding", fund_text),
+            ("Investors", investors),
+            ("Location", location),
+            ("Industries", industries if industries != "N/A" else None),
+            ("Web Traffic", traffic),
+            ("Status", status),
+        )
+        fields = [{"type": "mrkdwn", "text": f"*{label}:*\n{value}"} for label, value in facts if value]
 
         if fields:
             blocks.append({"type": "section", "fields": fields})
@@ -549,28 +711,6 @@ class SlackBot:
             trimmed = desc if len(desc) < 600 else desc[:600].rsplit(" ", 1)[0] + "..."
             blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*Description:*\n{trimmed}"}})
 
-        # Optional extra sections
-        def add_list_section(title, items, formatter=None, max_items=5):
-            """Add a list-based section with optional custom formatting per item."""
-            if not items:
-                return None
-
-            lines = []
-            for item in items[:max_items]:
-                if formatter:
-                    lines.append(formatter(item))
-                else:
-                    # fallback: plain string
-                    lines.append(str(item))
-
-            if not lines:
-                return None
-
-            return {
-                "type": "section",
-                "text": {"type": "mrkdwn", "text": f"*{title}:*\n" + "\n".join(lines)}
-            }
-
         # Website
         if company_data.get("website"):
             blocks.append({
@@ -578,17 +718,11 @@ class SlackBot:
                 "text": {"type": "mrkdwn", "text": f"*Website:*\n<{company_data['website']}>"}
             })
 
-        extras = [
-            add_list_section("Customer Types", company_data.get("customerTypes")),
-            add_list_section("Owned Patents", company_data.get("ownedPatents")),
-            add_list_section("Government Awards", company_data.get("governmentAwards")),
-            add_list_section("Products", company_data.get("productList"), formatter=format_product),
-            add_list_section("Business Models", company_data.get("businessModelList")),
-        ]
-
-        for section in extras:
-            if section:
-                blocks.append(section)
+        # Optional extra sections; most companies have few of these, so skip empty ones up front
+        for title, key, formatter in _EXTRA_SECTIONS:
+            items = company_data.get(key)
+            if items:
+                blocks.append(_list_section(title, items, formatter))
 
 
         return blocks
@@ -614,8 +748,13 @@ class SlackBot:
                 )
                 return
 
-            # Execute search
-            results = search_aviato_companies(search_filters)
+            # Truncate CSV rows for safety; fetch one extra row to tell whether there are more
+            MAX_CSV_ROWS = 500
+
+            # Execute search in a thread so the blocking HTTP call doesn't stall the event loop
+            results = await self._loop.run_in_executor(
+                self._blocking_pool, search_aviato_companies, search_filters, MAX_CSV_ROWS + 1
+            )
             companies = []
             if not results:
                 companies = []
@@ -639,39 +778,27 @@ class SlackBot:
                 )
                 return
 
-            # Truncate CSV rows for safety
-            MAX_CSV_ROWS = 500
             truncated_companies = companies[:MAX_CSV_ROWS]
 
             # Build CSV
             csv_content = self.create_csv_from_results(truncated_companies)
 
-            # Write to temp file
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, encoding="utf-8") as temp_file:
-                temp_file.write(csv_content)
-                temp_file_path = temp_file.name
-
             # Prepare note for message
             total_count = len(companies)
             if total_count > MAX_CSV_ROWS:
-                note = f"API returned {total_count} companies. showing top {MAX_CSV_ROWS} in csv file."
+                note = f"API returned more than {MAX_CSV_ROWS} companies. showing top {MAX_CSV_ROWS} in csv file."
             else:
                 note = f"API returned {total_count} companies."
 
-            # Upload CSV file (no initial comment)
+            # Upload CSV file from memory (no initial comment)
             filename = f"company_search_results_{len(truncated_companies)}_companies.csv"
-            try:
-                with open(temp_file_path, "rb") as file_content:
-                    await self.web_client.files_upload_v2(
-                        channel=channel_id,
-                        thread_ts=thread_ts,
-                        file=file_content,
-                        filename=filename,
-                        title="Company Search Results"
-                    )
-            finally:
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+            await self.web_client.files_upload_v2(
+                channel=channel_id,
+                thread_ts=thread_ts,
+                file=io.BytesIO(csv_content.encode("utf-8")),
+                filename=filename,
+                title="Company Search Results"
+            )
 
             # Send concise message
             await self.web_client.chat_postMessage(
@@ -721,36 +848,13 @@ class SlackBot:
     def parse_search_params(self, params: str) -> dict:
         """Parse search parameters from text like 'industry: "Software, AI" country: "United States" founded: 2021'"""
         search_filters = {}
-        params = params.replace("“", "\"").replace("”", "\"")
-        
-        # Pattern to match key: "value" or key: value (handles spaces in quoted values)
-        pattern = r'(\w+):\s*(?:"([^"]+)"|([^\s]+))'
-        matches = re.findall(pattern, params, re.IGNORECASE)
+        params = params.translate(_SMART_QUOTES)
         
-        for match in matches:
-            key = match[0].lower()
-            value = match[1] if match[1] else match[2]
-            
-            if key in ['industry', 'industries']:
-                # Split comma-separated industries and clean up quotes
-                industries = [i.strip().strip('"\'') for i in value.split(',') if i.strip()]
-                search_filters['industryList'] = industries
-            elif key == 'country':
-                search_filters['country'] = value
-            elif key == 'region':
-                search_filters['region'] = value
-            elif key == 'locality':
-                search_filters['locality'] = value
-            elif key in ['funding', 'totalfunding']:
-                try:
-                    search_filters['totalFunding'] = int(value)
-                except ValueError:
-                    continue
-            elif key == 'founded':
-                try:
-                    search_filters['founded'] = int(value)
-                except ValueError:
-                    continue
+        for key, value in _parse_params(params):
+            entry = _PARAM_HANDLERS.get(key)
+            if entry is not None:
+                field, handler = entry
+                handler(search_filters, field, value)
         
         return search_filters
 
@@ -761,80 +865,59 @@ class SlackBot:
         if not companies:
             return ""
         
-        # Candidate CSV columns in desired order (website right after name)
-        candidate_columns = ['name', 'website', 'industryList', 'locality', 'region', 'country']
-        
-        output = io.StringIO()
+        output = io.StringIO(newline="")
         rows = []
 
-        # First pass: normalize fields and collect which candidate columns have any data
+        # Build rows and collect which candidate columns have any data
         non_empty_columns = set()
+        track = True
         for company in companies:
-            processed_company = company.copy()
-
-            # Normalize industry list to string
-            if isinstance(processed_company.get('industryList'), list):
-                processed_company['industryList'] = ', '.join([str(x) for x in processed_company['industryList'] if x is not None])
-
-            # Derive website from various structures if explicit website missing
-            if not processed_company.get('website'):
-                urls_val = processed_company.get('URLs')
-                website_candidate = None
-                try:
-                    if isinstance(urls_val, list) and urls_val:
-                        first_item = urls_val[0]
-                        if isinstance(first_item, str):
-                            website_candidate = first_item
-                        elif isinstance(first_item, dict):
-                            website_candidate = first_item.get('website') or first_item.get('url') or first_item.get('homepage')
-                    elif isinstance(urls_val, dict):
-                        website_candidate = urls_val.get('website') or urls_val.get('url') or urls_val.get('homepage')
-                        if not website_candidate:
-                            for v in urls_val.values():
-                                if isinstance(v, str) and v.startswith(('http://', 'https://')):
-                                    website_candidate = v
-                                    break
-                    elif isinstance(urls_val, str):
-                        website_candidate = urls_val
-                except Exception:
-                    website_candidate = None
-
-                if website_candidate:
-                    processed_company['website'] = website_candidate
-
-            # Keep only candidate columns for the row
-            row = {k: processed_company.get(k) for k in candidate_columns}
-
-            # Determine if each column has any non-empty value
-            for k, v in row.items():
-                if v is None:
-                    continue
-                if isinstance(v, str) and v.strip() == "":
-                    continue
-                if isinstance(v, (list, dict)) and len(v) == 0:
-                    continue
-                non_empty_columns.add(k)
+            # One cell per candidate column, read straight off the company: industry list
+            # flattened to a string, website derived from URLs if explicit website missing
+            row = (
+                company.get('name'),
+                company.get('website') or _extract_website(company.get('URLs')),
+                _industry_text(company.get('industryList')),
+                company.get('locality'),
+                company.get('region'),
+                company.get('country'),
+            )
+
+            # Note which columns have any data
+            if track:
+                for k, v in zip(_CSV_COLUMNS, row):
+                    # Blank strings don't count as data
+                    if v and (type(v) is not str or v.strip()):
+                        non_empty_columns.add(k)
+                # Once every column has data there is nothing left to find
+                track = len(non_empty_columns) < len(_CSV_COLUMNS)
 
             rows.append(row)
 
         # Finalize columns: only include those with data, in desired order
-        columns = [c for c in candidate_columns if c in non_empty_columns]
-        writer = csv.DictWriter(output, fieldnames=columns, extrasaction='ignore')
+        col_idx = [i for i, c in enumerate(_CSV_COLUMNS) if c in non_empty_columns]
+        writer = csv.writer(output)
 
         # Write header and rows
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+        writer.writerow([_CSV_COLUMNS[i] for i in col_idx])
+        writer.writerows([row[i] for i in col_idx] for row in rows)
         
         return output.getvalue()
 
 
     async def start(self):
         logger.info("Starting Slack bot...")
+        self._loop = asyncio.get_running_loop()
+        # Python 3.12+: new tasks run synchronously up to their first real await,
+        # so handlers that finish after one postMessage skip a trip through the scheduler
+        eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_task_factory is not None:
+            self._loop.set_task_factory(eager_task_factory)
         await self.socket_mode_client.connect()
         logger.info("Slack bot connected.")
 
     async def stop(self):
         logger.info("Stopping Slack bot...")
         await self.socket_mode_client.disconnect()
+        self._blocking_pool.shutdown(wait=False, cancel_futures=True)
         logger.info("Slack bot stopped.")
@@ -0,0 +1,205 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api import cache
+from api.cache import DiskCache, TTLCache, clear_caches, ttl_cached
+
+
+class FakeClock:
+    """Stands in for the `time` module inside api.cache."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use_disk_cache(self):
+        """Point get_disk_cache() at a fresh SQLite file for this test."""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "cache.sqlite3")
+        for patcher in (
+            mock.patch.dict(os.environ, {"AVIATO_CACHE_PATH": path}),
+            mock.patch.object(cache, "_disk_cache", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        disk = cache.get_disk_cache()
+        self.addCleanup(disk._conn.close)
+        return disk
+
+
+class TTLCacheTest(CacheTestCase):
+    def test_entries_expire_after_ttl(self):
+        c = TTLCache(maxsize=10, ttl=60)
+        c.set("a", 1)
+        self.clock.now += 59
+        self.assertEqual(c.get("a"), 1)
+        self.clock.now += 1
+        self.assertIsNone(c.get("a"))
+        self.assertEqual(len(c), 0)
+
+    def test_get_default(self):
+        c = TTLCache(maxsize=10, ttl=60)
+        self.assertEqual(c.get("missing", "dflt"), "dflt")
+
+    def test_set_refreshes_ttl(self):
+        c = TTLCache(maxsize=10, ttl=60)
+        c.set("a", 1)
+        self.clock.now += 50
+        c.set("a", 2)
+        self.clock.now += 50
+        self.assertEqual(c.get("a"), 2)
+
+    def test_evicts_least_recently_used(self):
+        c = TTLCache(maxsize=2, ttl=60)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")  # "b" is now the least recently used
+        c.set("c", 3)
+        self.assertEqual(len(c), 2)
+        self.assertIsNone(c.get("b"))
+        self.assertEqual(c.get("a"), 1)
+        self.assertEqual(c.get("c"), 3)
+
+
+class DiskCacheTest(CacheTestCase):
+    def test_round_trip(self):
+        disk = self.use_disk_cache()
+        value = {"name": "Acme", "founders": [{"id": "p1"}], "funding": 1.5}
+        disk.set("company:abc:v1", value, ttl=60)
+        self.assertEqual(disk.get("company:abc:v1"), value)
+        self.assertIsNone(disk.get("company:other:v1"))
+
+    def test_survives_reopen(self):
+        disk = self.use_disk_cache()
+        disk.set("k", [1, 2, 3], ttl=60)
+        reopened = DiskCache(os.environ["AVIATO_CACHE_PATH"])
+        self.addCleanup(reopened._conn.close)
+        self.assertEqual(reopened.get("k"), [1, 2, 3])
+
+    def test_entries_expire(self):
+        disk = self.use_disk_cache()
+        disk.set("k", "v", ttl=60)
+        self.clock.now += 60
+        self.assertEqual(disk.get("k", "gone"), "gone")
+
+    def test_disabled_without_path(self):
+        with mock.patch.dict(os.environ, {"AVIATO_CACHE_PATH": ""}), \
+                mock.patch.object(cache, "_disk_cache", None):
+            self.assertIsNone(cache.get_disk_cache())
+
+
+class TTLCachedTest(CacheTestCase):
+    def test_caches_truthy_results(self):
+        calls = []
+
+        @ttl_cached(ttl=60)
+        def fetch(company_id, limit=10):
+            calls.append(company_id)
+            return {"id": company_id}
+
+        self.assertEqual(fetch("a"), {"id": "a"})
+        self.assertEqual(fetch(company_id="a"), {"id": "a"})
+        self.assertEqual(fetch("a", limit=10), {"id": "a"})
+        fetch("a", limit=5)
+        self.assertEqual(calls, ["a", "a"])
+
+    def test_falsy_results_not_cached(self):
+        results = [None, [], {}, {"id": "a"}]
+        calls = []
+
+        @ttl_cached(ttl=60)
+        def fetch(company_id):
+            calls.append(company_id)
+            return results[len(calls) - 1]
+
+        for _ in range(5):
+            fetch("a")
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(fetch("a"), {"id": "a"})
+
+    def test_expires_after_ttl(self):
+        calls = []
+
+        @ttl_cached(ttl=60)
+        def fetch(company_id):
+            calls.append(company_id)
+            return [company_id]
+
+        fetch("a")
+        self.clock.now += 60
+        fetch("a")
+        self.assertEqual(calls, ["a", "a"])
+
+    def test_custom_key(self):
+        calls = []
+
+        @ttl_cached(ttl=60, key=lambda url, **kw: url.rstrip("/") or None)
+        def fetch(url, verbose=False):
+            calls.append(url)
+            return [url]
+
+        fetch("https://acme.com/")
+        fetch("https://acme.com", verbose=True)
+        fetch("/")
+        fetch("/")
+        self.assertEqual(calls, ["https://acme.com/", "/", "/"])
+        self.assertEqual(fetch.cache.get(("https://acme.com",)), ["https://acme.com/"])
+
+    def test_persist_to_disk(self):
+        disk = self.use_disk_cache()
+        calls = []
+
+        @ttl_cached(ttl=60, persist_as="founders", version="v2")
+        def fetch(company_id):
+            calls.append(company_id)
+            return [{"id": "p1"}]
+
+        fetch("abc")
+        self.assertEqual(disk.get("founders:abc:v2"), [{"id": "p1"}])
+
+        # A fresh process only has the disk copy
+        fetch.cache.clear()
+        self.assertEqual(fetch("abc"), [{"id": "p1"}])
+        self.assertEqual(calls, ["abc"])
+
+
+class ClearCachesTest(CacheTestCase):
+    def test_clears_memory_caches(self):
+        @ttl_cached(ttl=60)
+        def fetch(company_id):
+            return [company_id]
+
+        standalone = cache.register(TTLCache(maxsize=4, ttl=60))
+        standalone.set("k", "v")
+        fetch("a")
+        clear_caches()
+        self.assertEqual(len(fetch.cache), 0)
+        self.assertEqual(len(standalone), 0)
+
+    def test_disk_only_cleared_when_asked(self):
+        disk = self.use_disk_cache()
+        disk.set("k", "v", ttl=60)
+        clear_caches()
+        self.assertEqual(disk.get("k"), "v")
+        clear_caches(disk=True)
+        self.assertIsNone(disk.get("k"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -147,9 +147,9 @@ if __name__ == "__main__":
         print(f"Contacts total: {result.get('contacts_count', 0)}")
         for c in contacts[:5]:
             print(
-                f"CONTACT: {c.get('name')} | {c.get('title')} | {c.get('company')} | "
-                f"Email: {c.get('email')} | emails_count: {c.get('emails_count')} | "
-                f"workEmail: {c.get('workEmail')} | personalEmail: {c.get('personalEmail')}"
+                f"CONTACT: {c.name} | {c.title} | {c.company} | "
+                f"Email: {c.email} | emails_count: {c.emails_count} | "
+                f"workEmail: {c.workEmail} | personalEmail: {c.personalEmail}"
             )
 
         # Print email coverage metrics
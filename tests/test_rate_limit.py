@@ -0,0 +1,121 @@
+import unittest
+from unittest import mock
+
+from api import aviato_client
+from api.aviato_client import RedisTokenBucket, TokenBucket
+
+
+class FakeClock:
+    """Stands in for the `time` module inside api.aviato_client; sleeping
+    advances the clock instead of blocking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.on_sleep = None
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.on_sleep:
+            self.on_sleep(seconds)
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(aviato_client, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_up_to_capacity_does_not_sleep(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket.take()
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(bucket.tokens, 0)
+
+    def test_token_reserved_before_sleeping_outside_lock(self):
+        bucket = TokenBucket(rate=2, capacity=1)
+        bucket.take()
+
+        seen = []
+        self.clock.on_sleep = lambda s: seen.append((bucket.tokens, bucket._lock.locked()))
+        bucket.take()
+        bucket.take()
+
+        # Each caller has already taken its token (balance negative) and
+        # released the lock by the time it sleeps
+        self.assertEqual(seen, [(-1, False), (-1, False)])
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+
+    def test_queued_callers_wait_for_their_own_token(self):
+        bucket = TokenBucket(rate=2, capacity=1)
+        self.clock.sleep = lambda s: self.clock.sleeps.append(s)  # nobody wakes up
+        for _ in range(4):
+            bucket.take()
+        self.assertEqual(self.clock.sleeps, [0.5, 1.0, 1.5])
+        self.assertEqual(bucket.tokens, -3)
+
+    def test_refill_capped_at_capacity(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket.take()
+        self.clock.now += 3600
+        bucket.take()
+        self.assertEqual(bucket.tokens, 2)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_partial_refill(self):
+        bucket = TokenBucket(rate=2, capacity=3)
+        for _ in range(3):
+            bucket.take()
+        self.clock.now += 0.75
+        bucket.take()
+        self.assertAlmostEqual(bucket.tokens, 0.5)
+
+
+class FakeRedis:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, lua):
+        return self.script
+
+
+class RedisTokenBucketTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(aviato_client, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sleeps_for_delay_returned_by_script(self):
+        calls = []
+
+        def script(keys, args):
+            calls.append((keys, args))
+            return b"0.25"
+
+        bucket = RedisTokenBucket(FakeRedis(script), "aviato:rl:test", rate=4, capacity=2)
+        bucket.take()
+        self.assertEqual(calls, [(["aviato:rl:test"], [4, 2])])
+        self.assertEqual(self.clock.sleeps, [0.25])
+
+    def test_falls_back_to_local_bucket_on_error(self):
+        def script(keys, args):
+            raise ConnectionError("redis down")
+
+        bucket = RedisTokenBucket(FakeRedis(script), "aviato:rl:test", rate=2, capacity=1)
+        with self.assertLogs(aviato_client.logger, "WARNING"):
+            bucket.take()
+            bucket.take()
+        self.assertEqual(bucket._fallback.tokens, -1)
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
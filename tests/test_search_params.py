@@ -0,0 +1,91 @@
+import re
+import unittest
+
+from slack.bot import SlackBot, _parse_params
+
+# The regex _parse_params replaced; the scanner must produce the same pairs
+_SEARCH_PARAM_RE = re.compile(r'(\w+)\s*:\s*(?:"([^"]+)"|(\S+))')
+
+
+def _regex_params(s):
+    return [(m[1].lower(), m[2] or m[3]) for m in _SEARCH_PARAM_RE.finditer(s)]
+
+
+CASES = [
+    # (description, text, expected pairs)
+    ("bare values", "country: US founded: 2021",
+     [("country", "US"), ("founded", "2021")]),
+    ("no space after colon", "country:US founded:2021",
+     [("country", "US"), ("founded", "2021")]),
+    ("space before colon", "country  :  US",
+     [("country", "US")]),
+    ("keys are lower-cased", "Country: US FOUNDED: 2021",
+     [("country", "US"), ("founded", "2021")]),
+    ("quoted value with spaces", 'industry: "Software, AI" country: "United States"',
+     [("industry", "Software, AI"), ("country", "United States")]),
+    ("quoted value containing a colon", 'industry: "a: b" founded: 2020',
+     [("industry", "a: b"), ("founded", "2020")]),
+    ("empty quotes fall back to a bare value", 'country: "" founded: 2020',
+     [("country", '""'), ("founded", "2020")]),
+    ("unterminated quote is a bare value", 'country: "United States',
+     [("country", '"United')]),
+    ("bare value keeps trailing punctuation", "funding: 1000000, country: US",
+     [("funding", "1000000,"), ("country", "US")]),
+    ("key after a colon run", "a::b",
+     [("a", ":b")]),
+    ("missing value at end", "country: ",
+     []),
+    ("missing key", ": US",
+     []),
+    ("key=value is not a param", "country=US founded=2021",
+     []),
+    ("text around params", "find me companies in industry: AI please",
+     [("industry", "AI")]),
+    ("key glued to previous word", "foo-bar: baz",
+     [("bar", "baz")]),
+    ("unicode word characters", "país: España",
+     [("país", "España")]),
+    ("empty string", "",
+     []),
+    ("only colons", ":::",
+     []),
+    ("newlines and tabs", "country:\n\tUS\nfounded :\t2021",
+     [("country", "US"), ("founded", "2021")]),
+]
+
+
+class ParseParamsTest(unittest.TestCase):
+    def test_cases(self):
+        for desc, text, expected in CASES:
+            with self.subTest(desc, text=text):
+                self.assertEqual(list(_parse_params(text)), expected)
+
+    def test_matches_old_regex(self):
+        for desc, text, _ in CASES:
+            with self.subTest(desc, text=text):
+                self.assertEqual(list(_parse_params(text)), _regex_params(text))
+
+
+class ParseSearchParamsTest(unittest.TestCase):
+    def setUp(self):
+        # parse_search_params doesn't touch any state set up in __init__
+        self.bot = SlackBot.__new__(SlackBot)
+
+    def test_smart_quotes(self):
+        self.assertEqual(
+            self.bot.parse_search_params("country: “United States” founded: 2021"),
+            {"country": "United States", "founded": 2021},
+        )
+
+    def test_malformed_ints_are_dropped(self):
+        self.assertEqual(
+            self.bot.parse_search_params("founded: 20x1 funding: -5 country: US"),
+            {"totalFunding": -5, "country": "US"},
+        )
+
+    def test_unknown_keys_ignored(self):
+        self.assertEqual(self.bot.parse_search_params("colour: blue"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()